@@ -1,18 +1,92 @@
-# app.py
-from flask import Flask, render_template, request
-import src.movie_scraper as movie_scraper
+import json
+import os
+import threading
+from flask import Flask, Response, g, render_template, request, stream_with_context
+from src.api import api, json_default
+from src.logging_config import setup_logging
+from src.metrics import end_trace, registry, start_trace
+from src.models import Session, init_db
+from src.search import cached_search, stream_search
+from src.showtime_store import showtime_store
 
 app = Flask(__name__)
+app.register_blueprint(api)
+
+logger = setup_logging(json_format=os.environ.get('LOG_JSON') == '1')
+
+# Importing the app (WSGI servers, tests, the import budget) must not touch the database
+_database_ready = False
+_database_lock = threading.Lock()
+
+@app.before_request
+def prepare_database():
+    global _database_ready
+    if _database_ready:
+        return
+    with _database_lock:
+        if not _database_ready:
+            # Answer searches from the crawled tables (DATABASE_URL, or the local SQLite fallback)
+            init_db()
+            # Columnar snapshot of upcoming showtimes for /api/schedule, built before the first request
+            showtime_store.get(Session)
+            Session.remove()
+            _database_ready = True
+
+@app.before_request
+def begin_trace():
+    # Opt-in per-request trace spans, returned as a Server-Timing header
+    if request.args.get('trace') or request.headers.get('X-Trace'):
+        g.trace, g.trace_token = start_trace(request.path)
+
+@app.after_request
+def finish_trace(response):
+    trace = g.pop('trace', None)
+    if trace is not None:
+        end_trace(g.pop('trace_token'))
+        response.headers['Server-Timing'] = ', '.join(
+            f'{name};dur={duration:.1f}' for name, duration in trace.totals().items()
+        )
+        logger.info(f"Trace {trace.name}: {trace.spans}")
+    return response
+
+@app.teardown_appcontext
+def remove_session(exception=None):
+    # Return the request's connection to the shared pool
+    Session.remove()
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
     results = None
+    freshness = None
     if request.method == 'POST':
         movie = request.form.get('movie')
         if movie:
-            # Call the smart search function from movie_scraper
-            results = movie_scraper.scrape_movie_info(movie)
-    return render_template('index.html', results=results)
+            # Cached, and shared with concurrent identical searches
+            found = cached_search(movie)
+            results, freshness = found['results'], found['freshness']
+    return render_template('index.html', results=results, freshness=freshness)
+
+@app.route('/metrics')
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/stream')
+def stream():
+    # Server-sent events: one 'results' event per theater as soon as it is scraped
+    movie = request.args.get('movie', '').strip()
+    if not movie:
+        return Response('Missing movie parameter', status=400)
+
+    def events():
+        for event in stream_search(movie):
+            yield f"event: results\ndata: {json.dumps(event, default=json_default)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 if __name__ == '__main__':
     # keep the web interface always active
@@ -0,0 +1,101 @@
+"""Compare HTML parser backends on saved theater listing pages.
+
+    python benchmarks/bench_parsers.py --pages path/to/saved_pages
+    python benchmarks/bench_parsers.py --save_synthetic benchmarks/pages
+
+Without --pages a synthetic listing page is generated in memory.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.html_parsers import available_parsers  # noqa: E402
+
+TITLES = ['Leo', 'Jawan', 'Pushpa: The Rule', 'Kalki 2898 AD', 'Devara', 'Dune: Part Two', 'Stree 2', 'Vettaiyan']
+
+
+def synthetic_page(movies=60, filler=40, seed=0, has_next=True):
+    """A listing page shaped like the theater sites: lots of markup, few relevant nodes."""
+    rng = random.Random(seed)
+    parts = ['<!doctype html><html><head><title>Programm</title>']
+    parts += [f'<script>var tracking{i} = {{"id": {i}}};</script>' for i in range(10)]
+    parts.append('</head><body><nav>' + '<a href="#">Menu</a>' * 30 + '</nav><main>')
+    for i in range(movies):
+        title = f"{rng.choice(TITLES)} ({rng.choice(['OmU', 'Tamil', 'Telugu', 'Hindi'])})"
+        times = ' '.join(f"{rng.randint(12, 22)}:{rng.choice(['00', '15', '30', '45'])}" for _ in range(3))
+        parts.append(
+            f'<article class="film" data-id="{i}"><img src="/poster/{i}.jpg" alt="">'
+            f'<div class="movie-title"><h3>{title}</h3></div>'
+            + '<p class="description">' + 'Lorem ipsum dolor sit amet. ' * filler + '</p>'
+            + f'<div class="showtime">Fr {rng.randint(1, 28):02d}.03. {times}</div>'
+            '<ul class="tags">' + '<li>Tag</li>' * 8 + '</ul></article>'
+        )
+    parts.append('</main>')
+    if has_next:
+        parts.append('<a class="next" href="?page=2">Weiter</a>')
+    parts.append('<footer>' + '<p>Impressum</p>' * 20 + '</footer></body></html>')
+    return ''.join(parts)
+
+
+def load_pages(directory):
+    pages = [path.read_text(encoding='utf-8', errors='replace') for path in sorted(Path(directory).glob('*.html'))]
+    if not pages:
+        raise SystemExit(f"No .html files found in {directory}")
+    return pages
+
+
+def bench(parser, pages, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            parser.parse(html)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark HTML parser backends")
+    arg_parser.add_argument('--pages', type=str, default=None, help='Directory of saved listing pages (*.html)')
+    arg_parser.add_argument('--repeat', type=int, default=20, help='Timed passes over all pages')
+    arg_parser.add_argument('--save_synthetic', type=str, default=None, help='Write synthetic pages to this directory and exit')
+    args = arg_parser.parse_args()
+
+    if args.save_synthetic:
+        out = Path(args.save_synthetic)
+        out.mkdir(parents=True, exist_ok=True)
+        for i in range(5):
+            (out / f'synthetic_{i}.html').write_text(synthetic_page(seed=i, has_next=i < 4), encoding='utf-8')
+        print(f"Wrote 5 synthetic pages to {out}")
+        return
+
+    pages = load_pages(args.pages) if args.pages else [synthetic_page(seed=i) for i in range(5)]
+    parsers = available_parsers()
+    total_kb = sum(len(html) for html in pages) / 1024
+    print(f"{len(pages)} pages, {total_kb:.0f} KiB, {args.repeat} passes, backends: {', '.join(parsers)}")
+
+    reference = None
+    rows = []
+    for name, parser in parsers.items():
+        output = [parser.parse(html).movies for html in pages]
+        if reference is None:
+            reference = output
+        elif output != reference:
+            print(f"warning: {name} output differs from {next(iter(parsers))}")
+        timings = bench(parser, pages, args.repeat)
+        per_page_ms = statistics.median(timings) / len(pages) * 1000
+        rows.append((per_page_ms, name))
+
+    fastest = min(rows)[0]
+    print(f"{'backend':<24}{'ms/page':>10}{'relative':>10}")
+    for per_page_ms, name in sorted(rows):
+        print(f"{name:<24}{per_page_ms:>10.3f}{per_page_ms / fastest:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Offline benchmark for TheaterScraper against the local replay server.
+
+    python benchmarks/bench_scraper.py --latency_ms 80 --pages 5 --repeat 5
+    python benchmarks/bench_scraper.py --parser stdlib-targeted --failure_rate 0.1 --json
+
+Measures search latency, pages/sec, parse time and peak Python memory for
+paginated_scrape (one theater, serial) and the concurrent scrape of all theaters.
+No network access is needed.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.replay_server import ReplayServer, add_config_arguments, config_from_args  # noqa: E402
+from src.http_client import HttpClient  # noqa: E402
+from src.movie_scraper import TheaterScraper  # noqa: E402
+from src.parse_pool import ParsePool  # noqa: E402
+from src.scrape_engine import AsyncScrapeEngine, HostPoliteness  # noqa: E402
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(name, timings, requests, results):
+    total = sum(timings)
+    return {
+        'scenario': name,
+        'runs': len(timings),
+        'median_s': round(statistics.median(timings), 4),
+        'p95_s': round(percentile(timings, 0.95), 4),
+        'pages_per_s': round(requests / total, 1) if total else 0.0,
+        'results': results
+    }
+
+
+def timed_runs(server, repeat, run):
+    timings = []
+    results = 0
+    server.reset_stats()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = len(run())
+        timings.append(time.perf_counter() - start)
+    return timings, server.requests, results
+
+
+def parse_times(scraper, server, pages):
+    html_pages = [server.page_html(theater, page) for theater in server.theaters for page in range(1, pages + 1)]
+    start = time.perf_counter()
+    for html in html_pages:
+        scraper.parser.parse(html)
+    return (time.perf_counter() - start) / len(html_pages) * 1000
+
+
+def peak_memory(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TheaterScraper against a local replay server")
+    add_config_arguments(parser)
+    parser.add_argument('--query', type=str, default='Pushpa', help='Movie searched for')
+    parser.add_argument('--parser', type=str, default=None, help='HTML backend (see src/html_parsers.py)')
+    parser.add_argument('--politeness', type=float, default=0.0, help='Per-host seconds between requests')
+    parser.add_argument('--host_concurrency', type=int, default=1, help='Concurrent requests allowed per host')
+    parser.add_argument('--prefetch', action='store_true', help='Fetch all pages of a listing concurrently')
+    parser.add_argument('--parse_workers', type=int, default=0, help='Parse in N worker processes (0: in-process)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scenario')
+    parser.add_argument('--skip_serial', action='store_true', help='Skip paginated_scrape (it sleeps 1s per page)')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    parse_pool = ParsePool(args.parse_workers) if args.parse_workers > 0 else None
+    with ReplayServer(config_from_args(args)) as server:
+        scraper = TheaterScraper(
+            parser=args.parser,
+            urls=server.base_urls(),
+            page_params=server.pagination_params(),
+            # No disk cache: every run must hit the replay server
+            http=HttpClient(cache=None)
+        )
+
+        def scrape_all():
+            politeness = HostPoliteness(args.politeness, args.host_concurrency)
+            engine = AsyncScrapeEngine(scraper, politeness, max_pages=args.pages, prefetch=args.prefetch,
+                                       parse_pool=parse_pool)
+            return engine.run(args.query)
+
+        rows = []
+        if not args.skip_serial:
+            theater, url, page_param = next(iter(scraper.targets()))
+            rows.append(summarize(
+                f'paginated_scrape[{theater}]',
+                *timed_runs(server, args.repeat, lambda: scraper.paginated_scrape(url, page_param, args.query, args.pages))
+            ))
+        rows.append(summarize('scrape_all_theaters', *timed_runs(server, args.repeat, scrape_all)))
+
+        report = {
+            'parser': scraper.parser.name,
+            'config': {
+                'pages': args.pages, 'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms,
+                'failure_rate': args.failure_rate, 'politeness': args.politeness,
+                'host_concurrency': args.host_concurrency, 'prefetch': args.prefetch,
+                'parse_workers': args.parse_workers
+            },
+            'parse_ms_per_page': round(parse_times(scraper, server, args.pages), 3),
+            'peak_memory_mib': round(peak_memory(scrape_all), 2),
+            'scenarios': rows
+        }
+    if parse_pool is not None:
+        parse_pool.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"parser={report['parser']} parse={report['parse_ms_per_page']} ms/page "
+          f"peak_mem={report['peak_memory_mib']} MiB config={report['config']}")
+    print(f"{'scenario':<32}{'median s':>10}{'p95 s':>10}{'pages/s':>10}{'results':>9}")
+    for row in rows:
+        print(f"{row['scenario']:<32}{row['median_s']:>10}{row['p95_s']:>10}{row['pages_per_s']:>10}{row['results']:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Import-time budget check for the scraping core and the web entry points.
+
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --repeat 5 --scale 2.0 --json
+
+Imports every module in a fresh interpreter with -X importtime and fails
+(exit status 1) when one exceeds its budget or pulls in a module it must not
+load, e.g. Streamlit in the scraping core. tests/test_import_budget.py runs
+the same check under pytest.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time in milliseconds: about twice what a small CPU-only runner measures
+# (src.movie_scraper ~110, src.crawler ~480, src.search ~460, app ~650), so noise does not flip the result
+BUDGETS = {
+    'src.movie_scraper': 250,
+    'src.crawler': 1000,
+    'src.search': 1000,
+    'app': 1400
+}
+
+# Heavy or UI-only packages each entry point must leave unimported
+FORBIDDEN = {
+    'src.movie_scraper': ['streamlit', 'trafilatura', 'bs4', 'lxml', 'selectolax', 'requests', 'sqlalchemy'],
+    'src.crawler': ['streamlit', 'trafilatura', 'bs4', 'requests', 'flask'],
+    'src.search': ['streamlit', 'trafilatura', 'bs4', 'requests', 'flask'],
+    'app': ['streamlit', 'trafilatura', 'bs4', 'requests', 'torch', 'transformers']
+}
+
+
+def measure(module):
+    """Returns (cumulative import ms, set of top-level packages loaded) for one fresh import."""
+    code = f"import sys; import {module}; print(','.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        # Nothing should touch the database on import; if that regresses, keep it away from a real one
+        env=dict(os.environ, DATABASE_URL='sqlite://')
+    )
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1].strip())
+    loaded = set(result.stdout.strip().splitlines()[-1].split(',')) if result.stdout.strip() else set()
+    return (cumulative_us or 0) / 1000, loaded
+
+
+def check(modules, repeat, scale):
+    report = []
+    for module in modules:
+        samples = [measure(module) for _ in range(repeat)]
+        best_ms = min(ms for ms, _ in samples)
+        loaded = samples[-1][1]
+        budget = BUDGETS[module] * scale
+        forbidden = sorted(name for name in FORBIDDEN.get(module, []) if name in loaded)
+        report.append({
+            'module': module,
+            'import_ms': round(best_ms, 1),
+            'budget_ms': round(budget, 1),
+            'forbidden_loaded': forbidden,
+            'ok': best_ms <= budget and not forbidden
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when entry points import too slowly or too much")
+    parser.add_argument('modules', nargs='*', default=list(BUDGETS), help='Modules to check (default: all budgeted)')
+    parser.add_argument('--repeat', type=int, default=3, help='Fresh imports per module; the fastest counts')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget, for slower machines')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    unknown = [module for module in args.modules if module not in BUDGETS]
+    if unknown:
+        parser.error(f"no budget for: {', '.join(unknown)}")
+
+    report = check(args.modules, args.repeat, args.scale)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'module':<22}{'import ms':>11}{'budget ms':>11}  forbidden imports")
+        for row in report:
+            print(f"{row['module']:<22}{row['import_ms']:>11}{row['budget_ms']:>11}  "
+                  f"{', '.join(row['forbidden_loaded']) or '-'}{'' if row['ok'] else '  FAIL'}")
+    if not all(row['ok'] for row in report):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
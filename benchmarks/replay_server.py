@@ -0,0 +1,179 @@
+"""Local HTTP server that replays paginated theater listings for offline benchmarks.
+
+Each theater gets its own port, so per-host politeness treats them as separate
+sites, just like the real CinemaxX/Capitol/Traumpalast/Lokah hosts.
+
+    python benchmarks/replay_server.py --pages 5 --latency_ms 80 --failure_rate 0.05
+
+Recorded pages can be replayed with --recorded DIR, using files named
+<theater>_<page>.html (e.g. capitol_1.html); missing pages fall back to synthetic ones.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_parsers import synthetic_page  # noqa: E402
+
+THEATERS = ['cinemaxx', 'capitol', 'traumpalast', 'lokahfilms']
+
+
+class ReplayConfig:
+    def __init__(self, pages=5, movies_per_page=60, latency_ms=50, jitter_ms=0, failure_rate=0.0,
+                 slow=None, recorded=None, seed=0):
+        self.pages = pages
+        self.movies_per_page = movies_per_page
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        # {theater: extra latency in ms} to model one misbehaving site
+        self.slow = slow or {}
+        self.recorded = Path(recorded) if recorded else None
+        self.seed = seed
+
+
+class ReplayServer:
+    """One ThreadingHTTPServer per theater on 127.0.0.1, with request statistics."""
+
+    def __init__(self, config=None, theaters=THEATERS):
+        self.config = config or ReplayConfig()
+        self.theaters = list(theaters)
+        self.servers = {}
+        self.threads = []
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._cache = {}
+
+    def page_html(self, theater, page):
+        key = (theater, page)
+        if key not in self._cache:
+            recorded = self.config.recorded / f"{theater}_{page}.html" if self.config.recorded else None
+            if recorded and recorded.exists():
+                self._cache[key] = recorded.read_text(encoding='utf-8', errors='replace')
+            else:
+                self._cache[key] = synthetic_page(
+                    movies=self.config.movies_per_page,
+                    seed=self.config.seed * 10007 + sum(map(ord, theater)) * 100 + page,
+                    has_next=page < self.config.pages
+                )
+        return self._cache[key]
+
+    def _handler(self, theater):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                config = server.config
+                with server._lock:
+                    server.requests += 1
+                    fail = server._rng.random() < config.failure_rate
+                    jitter = server._rng.uniform(0, config.jitter_ms)
+                time.sleep((config.latency_ms + jitter + config.slow.get(theater, 0)) / 1000)
+
+                query = parse_qs(urlsplit(self.path).query)
+                page = int(query.get('page', ['1'])[0])
+                if fail or page > config.pages:
+                    with server._lock:
+                        server.failures += fail
+                    body = b'unavailable' if fail else b'not found'
+                    self.send_response(503 if fail else 404)
+                else:
+                    body = server.page_html(theater, page).encode('utf-8')
+                    self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        for theater in self.theaters:
+            httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler(theater))
+            httpd.daemon_threads = True
+            thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+            thread.start()
+            self.servers[theater] = httpd
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        for httpd in self.servers.values():
+            httpd.shutdown()
+            httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def base_urls(self):
+        # Same shape as movie_scraper.base_urls, pointing at the local ports
+        return {theater: f"http://127.0.0.1:{httpd.server_address[1]}/{theater}" for theater, httpd in self.servers.items()}
+
+    def pagination_params(self):
+        return {theater: '?page={}' for theater in self.servers}
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = 0
+            self.failures = 0
+
+
+def parse_slow(values):
+    slow = {}
+    for value in values or []:
+        theater, _, ms = value.partition(':')
+        slow[theater] = float(ms)
+    return slow
+
+
+def add_config_arguments(parser):
+    parser.add_argument('--pages', type=int, default=5, help='Pages per theater listing')
+    parser.add_argument('--movies_per_page', type=int, default=60, help='Movies on each synthetic page')
+    parser.add_argument('--latency_ms', type=float, default=50, help='Base response latency')
+    parser.add_argument('--jitter_ms', type=float, default=0, help='Random extra latency')
+    parser.add_argument('--failure_rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--slow', action='append', help='theater:ms extra latency, may be repeated')
+    parser.add_argument('--recorded', type=str, default=None, help='Directory of recorded <theater>_<page>.html files')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def config_from_args(args):
+    return ReplayConfig(
+        pages=args.pages, movies_per_page=args.movies_per_page, latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, failure_rate=args.failure_rate, slow=parse_slow(args.slow),
+        recorded=args.recorded, seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve replayed theater listings locally")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    with ReplayServer(config_from_args(args)) as server:
+        for theater, url in server.base_urls().items():
+            print(f"{theater:<12} {url}?page=1")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+import base64
+import gzip
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, request
+
+from src.models import Movie, Session, Showtime, Theater
+from src.persistence import local_today
+from src.search import cached_search, watchlist_search
+from src.showtime_store import showtime_store
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+GZIP_MIN_BYTES = 512
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def json_default(value):
+    # Datetimes (freshness, crawled_at, showtime) as ISO 8601 strings
+    return value.isoformat()
+
+
+def encode_cursor(data):
+    raw = json.dumps(data, separators=(',', ':'), default=json_default).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ApiError('Invalid cursor')
+    if not isinstance(data, dict):
+        raise ApiError('Invalid cursor')
+    return data
+
+
+def decode_offset(cursor):
+    offset = decode_cursor(cursor).get('offset', 0)
+    # bool is an int subclass; a negative offset would slice from the end
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise ApiError('Invalid cursor')
+    return offset
+
+
+def get_limit():
+    try:
+        limit = int(request.args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError('limit must be an integer')
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def json_response(payload, status=200):
+    """Compact JSON with a strong ETag over the exact bytes sent, 304 and gzip support."""
+    body = json.dumps(payload, separators=(',', ':'), default=json_default).encode('utf-8')
+    response = Response(mimetype='application/json', status=status)
+    response.vary.add('Accept-Encoding')
+    if len(body) >= GZIP_MIN_BYTES and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        # mtime=0 keeps the compressed bytes, and therefore the ETag, deterministic
+        body = gzip.compress(body, mtime=0)
+        response.headers['Content-Encoding'] = 'gzip'
+    response.set_data(body)
+    if status == 200:
+        response.set_etag(hashlib.sha256(body).hexdigest()[:32])
+        response.make_conditional(request)
+    return response
+
+
+@api.errorhandler(ApiError)
+def handle_api_error(error):
+    return json_response({'error': str(error)}, status=error.status)
+
+
+@api.route('/search')
+def search():
+    movie = request.args.get('movie', '').strip()
+    if not movie:
+        raise ApiError('Missing movie parameter')
+    limit = get_limit()
+    offset = decode_offset(request.args['cursor']) if request.args.get('cursor') else 0
+
+    found = cached_search(movie)
+    results = found['results']
+    page = results[offset:offset + limit]
+    next_offset = offset + len(page)
+    return json_response({
+        'movie': movie,
+        'freshness': found['freshness'],
+        'total': len(results),
+        'results': page,
+        'next_cursor': encode_cursor({'offset': next_offset}) if next_offset < len(results) else None
+    })
+
+
+@api.route('/showtimes')
+def showtimes():
+    limit = get_limit()
+    query = (
+        Session.query(Showtime.id, Showtime.showtime, Theater.name, Theater.url, Movie.title)
+        .join(Theater, Showtime.theater_id == Theater.id)
+        .join(Movie, Showtime.movie_id == Movie.id)
+    )
+
+    theater = request.args.get('theater', '').strip()
+    if theater:
+        query = query.filter((Theater.name == theater) | (Theater.url == theater))
+    date = request.args.get('date', '').strip()
+    if date:
+        try:
+            day = datetime.strptime(date, '%Y-%m-%d')
+        except ValueError:
+            raise ApiError('date must be YYYY-MM-DD')
+        query = query.filter(Showtime.showtime >= day, Showtime.showtime < day + timedelta(days=1))
+
+    # Keyset pagination on (showtime, id) stays index-backed however deep the client pages
+    if request.args.get('cursor'):
+        cursor = decode_cursor(request.args['cursor'])
+        try:
+            after_time = datetime.fromisoformat(cursor['showtime'])
+            after_id = int(cursor['id'])
+        except (KeyError, TypeError, ValueError):
+            raise ApiError('Invalid cursor')
+        query = query.filter(
+            (Showtime.showtime > after_time) | ((Showtime.showtime == after_time) & (Showtime.id > after_id))
+        )
+
+    rows = query.order_by(Showtime.showtime, Showtime.id).limit(limit + 1).all()
+    page = rows[:limit]
+    items = [
+        {'id': row.id, 'showtime': row.showtime, 'theater': row.name, 'theater_url': row.url, 'movie': row.title}
+        for row in page
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor({'showtime': last.showtime, 'id': last.id})
+    return json_response({'showtimes': items, 'next_cursor': next_cursor})
+
+
+def parse_clock(name):
+    value = request.args.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%H:%M').time()
+    except ValueError:
+        raise ApiError(f'{name} must be HH:MM')
+
+
+@api.route('/schedule')
+def schedule():
+    """Filters upcoming showtimes in memory, e.g. ?theater=leonberg&date=2024-03-15&after=18:00"""
+    from src.crawler import movie_title_index
+
+    date = request.args.get('date', '').strip()
+    try:
+        day = datetime.strptime(date, '%Y-%m-%d') if date else local_today()
+    except ValueError:
+        raise ApiError('date must be YYYY-MM-DD')
+    after = parse_clock('after')
+    before = parse_clock('before')
+    start = datetime.combine(day.date(), after) if after else day
+    end = datetime.combine(day.date(), before) if before else day + timedelta(days=1)
+
+    store = showtime_store.get(Session)
+    movie_ids = None
+    movie = request.args.get('movie', '').strip()
+    if movie:
+        movie_ids = movie_title_index.movie_ids(Session, movie)
+    items = store.query(start, end, theater=request.args.get('theater', '').strip() or None,
+                        movie_ids=movie_ids, limit=get_limit())
+    return json_response({'showtimes': items})
+
+
+@api.route('/watchlist', methods=['POST'])
+def watchlist():
+    """{"titles": ["Leo", "Pushpa 2", ...]} -> results per title from crawled or cached data.
+
+    Titles without any are crawled in the background with one shared crawl and
+    listed under "pending" (202 Accepted); post the list again to pick them up.
+    """
+    payload = request.get_json(silent=True) or {}
+    titles = payload.get('titles')
+    if not isinstance(titles, list) or not all(isinstance(title, str) for title in titles):
+        raise ApiError('titles must be a list of strings')
+    titles = [title.strip() for title in titles if title.strip()]
+    if not titles:
+        raise ApiError('Missing titles')
+    if len(titles) > MAX_LIMIT:
+        raise ApiError(f'At most {MAX_LIMIT} titles per request')
+    found, pending = watchlist_search(titles)
+    results = {title: found[title]['results'] if title in found else [] for title in titles}
+    return json_response({'results': results, 'pending': pending}, status=202 if pending else 200)
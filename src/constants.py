@@ -25,3 +25,71 @@ THEATER_URLS = {
     'capitol': 'https://capitol-kornwestheim.de/',
     'traumpalast': 'https://leonberg.traumpalast.de/'
 }
+
+# HTTP client settings (connect, read) timeouts in seconds
+HTTP_TIMEOUT = (3.05, 10)
+HTTP_POOL_SIZE = 10
+HTTP_CACHE_DIR = '.http_cache'
+HTTP_CACHE_TTL = 300
+HTTP_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Crawl refresh intervals in seconds, per theater key of TheaterScraper.base_urls
+DEFAULT_REFRESH_INTERVAL = 30 * 60
+THEATER_REFRESH_INTERVALS = {
+    'cinemaxx': 30 * 60,
+    'capitol': 60 * 60,
+    'traumpalast': 30 * 60,
+    'lokahfilms': 2 * 60 * 60
+}
+
+# Showtimes are stored as naive wall-clock times of the theaters' time zone
+THEATER_TIMEZONE = 'Europe/Berlin'
+
+# Database settings; DATABASE_URL overrides the local SQLite fallback
+DEFAULT_DATABASE_URL = 'sqlite:///showtimes.db'
+DB_POOL_SIZE = 5
+DB_MAX_OVERFLOW = 10
+DB_POOL_TIMEOUT = 30
+DB_POOL_RECYCLE = 30 * 60
+
+# Search result cache shared by the web front ends
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = 5 * 60
+
+# Logging (see src/logging_config.py)
+LOG_DIR = 'logs'
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Per-host politeness floor: where the adaptive budget starts, and the fixed HostPoliteness budget
+HOST_MIN_INTERVAL = 1.0
+HOST_MAX_CONCURRENCY = 1
+# Speculative page prefetch: request pages 1..max_pages of a listing at once
+PREFETCH_PAGES = False
+# Threads running blocking HTTP requests for the scrape engine
+FETCH_WORKERS = 32
+# Worker processes for the parse/match stage of crawls; 0 parses in-process
+PARSE_WORKERS = 0
+# Seconds before the in-memory showtime store is rebuilt from the database
+SHOWTIME_STORE_TTL = 60
+# Adaptive per-host limits: AIMD between the politeness floor above and these ceilings
+ADAPTIVE_MAX_INTERVAL = 4.0
+HOST_ADAPTIVE_MAX_CONCURRENCY = 4
+# Retries of 429/5xx and network errors, with full-jitter exponential backoff
+FETCH_RETRIES = 2
+RETRY_BACKOFF = 0.5
+RETRY_MAX_BACKOFF = 10.0
+# Seconds one theater listing may take before it is abandoned for last-known data
+TARGET_DEADLINE = 15
+# Consecutive failed requests that open a host's circuit breaker, and its cool-down in seconds
+BREAKER_FAILURES = 5
+BREAKER_COOLDOWN = 2 * 60
+LAST_KNOWN_SIZE = 1024
+# Durable crawl queue shared by the coordinator and worker processes (see src/work_queue.py)
+WORK_QUEUE_PATH = 'crawl_queue.db'
+QUEUE_LEASE_SECONDS = 2 * 60
+QUEUE_MAX_ATTEMPTS = 5
+QUEUE_WORKERS = 4
+# Streaming crawls: bytes read per chunk, and results buffered between crawl threads and the consumer
+STREAM_CHUNK_SIZE = 16 * 1024
+STREAM_QUEUE_SIZE = 256
@@ -0,0 +1,233 @@
+import argparse
+import logging
+import re
+import time
+from datetime import datetime
+
+from src.constants import DEFAULT_REFRESH_INTERVAL, PARSE_WORKERS, THEATER_REFRESH_INTERVALS
+from src.incremental import IncrementalScraper, apply_page_diffs, load_fingerprints
+from src.logging_config import setup_logging
+from src.models import Movie, ShowtimeSummary, Theater, init_db, session_scope
+from src.movie_scraper import TheaterScraper
+from src.parse_pool import ParsePool
+from src.persistence import local_now, upsert_movies, upsert_theaters
+from src.scrape_engine import AsyncScrapeEngine
+from src.title_index import TitleIndex
+
+logger = logging.getLogger('MovieScraper')
+
+DATE_PATTERN = re.compile(r'\b(\d{1,2})\.(\d{1,2})\.(\d{4})?')
+TIME_PATTERN = re.compile(r'\b([01]?\d|2[0-3])[:.]([0-5]\d)\b(?!\.)')
+
+
+def normalize_title(title):
+    return ' '.join(title.split())
+
+
+def parse_showtimes(times_text, today=None):
+    """Turns scraped showtime text like 'Fr 14.03. 17:30 Sa 15.03. 20:00' into datetimes.
+
+    Each time belongs to the date before it (times ahead of the first date to
+    the first date); without any date they are assumed to be today. Invalid
+    dates are skipped, and dates without a year that lie more than half a year
+    back are taken to be next year's (a January listing crawled in December).
+    """
+    today = today or local_now()
+    today = datetime(today.year, today.month, today.day)
+    dates = list(DATE_PATTERN.finditer(times_text))
+    if not dates:
+        return [today.replace(hour=int(h), minute=int(m)) for h, m in TIME_PATTERN.findall(times_text)]
+    showtimes = []
+    for index, date_match in enumerate(dates):
+        end = dates[index + 1].start() if index + 1 < len(dates) else len(times_text)
+        segment = times_text[date_match.end():end]
+        if index == 0:
+            segment = times_text[:date_match.start()] + ' ' + segment
+        base = _listing_date(*date_match.groups(), today)
+        if base is None:
+            logger.debug(f"Skipping invalid date {date_match.group(0)!r} in {times_text!r}")
+            continue
+        showtimes.extend(base.replace(hour=int(h), minute=int(m)) for h, m in TIME_PATTERN.findall(segment))
+    return showtimes
+
+
+def _listing_date(day, month, year, today):
+    try:
+        if year:
+            return datetime(int(year), int(month), int(day))
+        date = datetime(today.year, int(month), int(day))
+        if (today - date).days > 183:
+            date = datetime(today.year + 1, int(month), int(day))
+        return date
+    except ValueError:
+        return None
+
+
+class CrawlScheduler:
+    """Periodically crawls every theater and stores the listings in the database."""
+
+    def __init__(self, session_factory=None, scraper=None, intervals=None, default_interval=DEFAULT_REFRESH_INTERVAL,
+                 parse_pool=None):
+        # None: the shared scoped Session through session_scope()
+        self.session_factory = session_factory
+        self.scraper = scraper or TheaterScraper()
+        self.intervals = intervals if intervals is not None else THEATER_REFRESH_INTERVALS
+        self.default_interval = default_interval
+        self.parse_pool = parse_pool
+        self.last_crawl = {}
+
+    def theaters(self):
+        return sorted({theater for theater, _, _ in self.scraper.targets()})
+
+    def due_theaters(self, now=None):
+        now = now or time.time()
+        return [
+            theater for theater in self.theaters()
+            if now - self.last_crawl.get(theater, 0) >= self.intervals.get(theater, self.default_interval)
+        ]
+
+    def crawl_theater(self, theater):
+        """Crawls one theater, parsing and writing only pages whose content changed."""
+        targets = [target for target in self.scraper.targets() if target[0] == theater]
+        urls = {url: theater for _, url, _ in targets}
+        with session_scope(self.session_factory) as session:
+            theater_ids = upsert_theaters(session, urls)
+            known = load_fingerprints(session, theater_ids.values())
+
+        incremental = IncrementalScraper(self.scraper, known)
+        for event in AsyncScrapeEngine(incremental, parse_pool=self.parse_pool).stream(None, targets):
+            if event['error']:
+                incremental.failed.add(event['url'])
+        self.persist(incremental, theater_ids)
+        self.last_crawl[theater] = time.time()
+        logger.info(
+            f"Crawled {theater}: {len(incremental.changed)} changed, "
+            f"{len(incremental.unchanged)} unchanged pages"
+        )
+        return sum(len(page['records']) for page in incremental.changed.values())
+
+    def persist(self, incremental, theater_ids):
+        vanished = incremental.vanished_pages(list(theater_ids))
+        if not incremental.changed and not vanished:
+            self.touch(incremental.unchanged)
+            return
+        with session_scope(self.session_factory) as session:
+            records = [record for page in incremental.changed.values() for record in page['records']]
+            movie_ids = upsert_movies(session, [normalize_title(record['title']) for record in records])
+            page_showtimes = {}
+            for page_url, page in incremental.changed.items():
+                showtimes = set()
+                for record in page['records']:
+                    movie_id = movie_ids[normalize_title(record['title'])]
+                    for start in parse_showtimes(record['times']):
+                        showtimes.add((theater_ids[page['target']], movie_id, start))
+                page_showtimes[page_url] = dict(page, showtimes=showtimes)
+            inserted, deleted = apply_page_diffs(session, page_showtimes, vanished, theater_ids, incremental.unchanged)
+        logger.info(f"Applied page diffs: {inserted} showtimes upserted, {deleted} removed")
+
+    def touch(self, unchanged):
+        if not unchanged:
+            return
+        with session_scope(self.session_factory) as session:
+            apply_page_diffs(session, {}, [], {}, unchanged)
+
+    def run_once(self):
+        for theater in self.due_theaters():
+            try:
+                self.crawl_theater(theater)
+            except Exception as e:
+                logger.error(f"Error while scraping theater {theater}: {e}")
+
+    def run_forever(self, poll_interval=30):
+        while True:
+            self.run_once()
+            time.sleep(poll_interval)
+
+
+class MovieTitleIndex:
+    """TitleIndex over the Movie table, extended with rows added since the last lookup."""
+
+    def __init__(self):
+        self.index = TitleIndex()
+        self.last_movie_id = 0
+
+    def refresh(self, session):
+        rows = (
+            session.query(Movie.id, Movie.title)
+            .filter(Movie.id > self.last_movie_id)
+            .order_by(Movie.id)
+            .all()
+        )
+        for movie_id, title in rows:
+            self.index.add(title, movie_id)
+            self.last_movie_id = movie_id
+
+    def movie_ids(self, session, movie_name, limit=20):
+        self.refresh(session)
+        return [movie_id for _, movie_id, _ in self.index.search(movie_name, limit=limit)]
+
+
+movie_title_index = MovieTitleIndex()
+
+
+def search_showtimes(session, movie_name, now=None):
+    """Answers a search from the per-day showtime summaries, with the age of the data."""
+    now = now or local_now()
+    movie_ids = movie_title_index.movie_ids(session, movie_name)
+    if not movie_ids:
+        return {'results': [], 'freshness': None}
+    rows = (
+        session.query(ShowtimeSummary.day, ShowtimeSummary.times, Theater.url, Theater.last_crawled_at, Movie.title)
+        .join(Theater, ShowtimeSummary.theater_id == Theater.id)
+        .join(Movie, ShowtimeSummary.movie_id == Movie.id)
+        .filter(ShowtimeSummary.movie_id.in_(movie_ids))
+        .filter(ShowtimeSummary.day >= now.date())
+        .order_by(Theater.url, Movie.title, ShowtimeSummary.day)
+        .all()
+    )
+    grouped = {}
+    for day, times, theater_url, crawled_at, title in rows:
+        entry = grouped.setdefault((theater_url, title), {
+            'theater': theater_url,
+            'title': title,
+            'times': [],
+            'link': theater_url,
+            'crawled_at': crawled_at
+        })
+        entry['times'].extend(f"{day:%d.%m.} {clock}" for clock in times.split(', '))
+    results = []
+    for entry in grouped.values():
+        entry['times'] = ', '.join(entry['times'])
+        results.append(entry)
+    crawl_times = [entry['crawled_at'] for entry in results if entry['crawled_at']]
+    return {
+        'results': results,
+        'freshness': min(crawl_times) if crawl_times else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl all theaters into the showtime database")
+    parser.add_argument('--once', action='store_true', help='Crawl every theater once and exit')
+    parser.add_argument('--poll_interval', type=int, default=30, help='Seconds between checks for due theaters')
+    parser.add_argument('--json_logs', action='store_true', help='Write logs as JSON lines')
+    parser.add_argument('--parse_workers', type=int, default=PARSE_WORKERS,
+                        help='Processes for HTML parsing (0 parses in the crawler process)')
+    args = parser.parse_args()
+
+    setup_logging(json_format=args.json_logs)
+    init_db()
+    parse_pool = ParsePool(args.parse_workers) if args.parse_workers > 0 else None
+    scheduler = CrawlScheduler(parse_pool=parse_pool)
+    try:
+        if args.once:
+            scheduler.run_once()
+        else:
+            scheduler.run_forever(args.poll_interval)
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+import codecs
+import os
+import re
+from html.parser import HTMLParser
+
+# Each backend turns a listing page into ListingPage(movies=[(title, times)], has_next).
+# `times` is the text of the first div.showtime after the title, or None.
+
+
+class ListingPage:
+    __slots__ = ('movies', 'has_next')
+
+    def __init__(self, movies, has_next):
+        self.movies = movies
+        self.has_next = has_next
+
+    def __repr__(self):
+        return f"ListingPage(movies={self.movies!r}, has_next={self.has_next!r})"
+
+
+# lxml refuses str input that carries its own encoding declaration
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+def clean_text(text):
+    return ' '.join(text.split())
+
+
+def has_class(attrs, name):
+    return name in (attrs.get('class') or '').split()
+
+
+class ListingCollector:
+    """Event sink that only keeps the nodes a listing needs.
+
+    Drives both the lxml target parser and the stdlib HTMLParser, so neither
+    builds a DOM; only movie titles, showtimes and the next link are kept.
+    A movie is complete once the showtime following its title has been read;
+    drain() hands out the complete ones so a streaming parse can forget them.
+    """
+
+    def __init__(self):
+        self.movies = []
+        self.has_next = False
+        self._pending = []
+        self._capture = None
+        self._depth = 0
+        self._buffer = []
+
+    def start(self, tag, attrs):
+        if tag == 'a' and has_class(attrs, 'next'):
+            self.has_next = True
+        if tag != 'div':
+            return
+        if self._capture is not None:
+            self._depth += 1
+        elif has_class(attrs, 'movie-title'):
+            self._capture, self._depth, self._buffer = 'title', 1, []
+        elif has_class(attrs, 'showtime') and self._pending:
+            self._capture, self._depth, self._buffer = 'showtime', 1, []
+
+    def end(self, tag):
+        if tag != 'div' or self._capture is None:
+            return
+        self._depth -= 1
+        if self._depth:
+            return
+        text = clean_text(''.join(self._buffer))
+        if self._capture == 'title':
+            self._pending.append(text)
+        else:
+            self.movies.extend((title, text) for title in self._pending)
+            self._pending = []
+        self._capture = None
+
+    def data(self, text):
+        if self._capture is not None:
+            self._buffer.append(text)
+
+    def drain(self):
+        movies, self.movies = self.movies, []
+        return movies
+
+    def close(self):
+        # Titles after the last showtime have none
+        self.movies.extend((title, None) for title in self._pending)
+        self._pending = []
+        return ListingPage(self.movies, self.has_next)
+
+
+class StdlibCollectorParser(HTMLParser):
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+class StdlibTargetedParser:
+    """Dependency-free event parser; no tree is built."""
+    name = 'stdlib-targeted'
+
+    def parse(self, html):
+        collector = ListingCollector()
+        parser = StdlibCollectorParser(collector)
+        parser.feed(html)
+        parser.close()
+        return collector.close()
+
+
+class LxmlTargetedParser:
+    """lxml's C parser feeding ListingCollector events; no tree is built."""
+    name = 'lxml-targeted'
+
+    def __init__(self):
+        from lxml import etree
+        self._etree = etree
+
+    def parse(self, html):
+        collector = ListingCollector()
+        parser = self._etree.HTMLParser(target=collector)
+        parser.feed(html)
+        return parser.close()
+
+
+class IncrementalListingParser:
+    """Parses a listing from byte chunks as they arrive, without holding the page or a tree.
+
+    feed() returns the movies completed by that chunk; close() returns the rest
+    and has_next. Uses lxml's feed parser when installed, else the stdlib one.
+    """
+
+    def __init__(self, encoding=None):
+        self.collector = ListingCollector()
+        try:
+            from lxml import etree
+        except ImportError:
+            self._parser = StdlibCollectorParser(self.collector)
+            self._decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+        else:
+            self._parser = etree.HTMLParser(target=self.collector, encoding=encoding or 'utf-8')
+            self._decoder = None
+        self._fed = False
+
+    def feed(self, chunk):
+        if self._decoder is not None:
+            chunk = self._decoder.decode(chunk)
+        if chunk:
+            self._parser.feed(chunk)
+            self._fed = True
+        return self.collector.drain()
+
+    def close(self):
+        if self._decoder is None:
+            # lxml refuses to close a document it never saw
+            page = self._parser.close() if self._fed else self.collector.close()
+        else:
+            self._parser.feed(self._decoder.decode(b'', final=True))
+            self._parser.close()
+            page = self.collector.close()
+        return page.movies, page.has_next
+
+
+class LxmlParser:
+    name = 'lxml'
+
+    def __init__(self):
+        import lxml.etree
+        import lxml.html
+        self._html = lxml.html
+        self._parser_error = lxml.etree.ParserError
+
+    def parse(self, html):
+        try:
+            root = self._html.fromstring(XML_DECLARATION.sub('', html, count=1))
+        except self._parser_error:
+            # Empty document; the other backends see a page without movies
+            return ListingPage([], False)
+        nodes = root.xpath(
+            "//div[contains(concat(' ', normalize-space(@class), ' '), ' movie-title ')"
+            " or contains(concat(' ', normalize-space(@class), ' '), ' showtime ')]"
+        )
+        movies = []
+        pending = []
+        for node in nodes:
+            if has_class(node.attrib, 'movie-title'):
+                movies.append([clean_text(node.text_content()), None])
+                pending.append(movies[-1])
+            elif pending:
+                for movie in pending:
+                    movie[1] = clean_text(node.text_content())
+                pending = []
+        has_next = bool(root.xpath("//a[contains(concat(' ', normalize-space(@class), ' '), ' next ')]"))
+        return ListingPage([tuple(movie) for movie in movies], has_next)
+
+
+class SelectolaxParser:
+    name = 'selectolax'
+
+    def __init__(self):
+        from selectolax.parser import HTMLParser as SelectolaxHTMLParser
+        self._parser = SelectolaxHTMLParser
+
+    def parse(self, html):
+        tree = self._parser(html)
+        movies = []
+        pending = []
+        for node in tree.css('div.movie-title, div.showtime'):
+            if has_class(node.attributes, 'movie-title'):
+                movies.append([clean_text(node.text()), None])
+                pending.append(movies[-1])
+            elif pending:
+                for movie in pending:
+                    movie[1] = clean_text(node.text())
+                pending = []
+        has_next = tree.css_first('a.next') is not None
+        return ListingPage([tuple(movie) for movie in movies], has_next)
+
+
+class SoupParser:
+    """BeautifulSoup backend; `targeted` restricts the tree with a SoupStrainer."""
+
+    def __init__(self, features='html.parser', targeted=False):
+        from bs4 import BeautifulSoup, SoupStrainer
+        self._soup = BeautifulSoup
+        self.features = features
+        self.strainer = None
+        if targeted:
+            self.strainer = SoupStrainer(['div', 'a'], class_=['movie-title', 'showtime', 'next'])
+        # Same names as the PARSERS keys, so a parser can be rebuilt by name in another process
+        self.name = ('bs4' if features == 'html.parser' else f"bs4-{features}") + ('-targeted' if targeted else '')
+
+    def parse(self, html):
+        soup = self._soup(html, self.features, parse_only=self.strainer)
+        movies = []
+        for movie in soup.find_all('div', class_='movie-title'):
+            times = movie.find_next('div', class_='showtime')
+            movies.append((clean_text(movie.text), clean_text(times.text) if times else None))
+        return ListingPage(movies, soup.find('a', class_='next') is not None)
+
+
+PARSERS = {
+    'selectolax': SelectolaxParser,
+    'lxml': LxmlParser,
+    'lxml-targeted': LxmlTargetedParser,
+    'stdlib-targeted': StdlibTargetedParser,
+    'bs4': SoupParser,
+    'bs4-targeted': lambda: SoupParser(targeted=True),
+    'bs4-lxml': lambda: SoupParser('lxml'),
+}
+
+# Fastest first; the stdlib parser is always importable
+PREFERENCE = ['selectolax', 'lxml-targeted', 'lxml', 'bs4-targeted', 'stdlib-targeted']
+
+
+def available_parsers():
+    found = {}
+    for name, factory in PARSERS.items():
+        try:
+            found[name] = factory()
+        except ImportError:
+            continue
+    return found
+
+
+def get_parser(name=None):
+    """Returns the named backend, or the fastest installed one.
+
+    The HTML_PARSER environment variable overrides the automatic choice.
+    """
+    name = name or os.environ.get('HTML_PARSER')
+    if name:
+        if name not in PARSERS:
+            raise ValueError(f"Unknown HTML parser: {name}")
+        return PARSERS[name]()
+    for candidate in PREFERENCE:
+        try:
+            return PARSERS[candidate]()
+        except ImportError:
+            continue
+    return StdlibTargetedParser()
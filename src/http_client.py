@@ -0,0 +1,228 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from src.constants import HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_TTL, HTTP_POOL_SIZE, HTTP_TIMEOUT
+from src.metrics import HTTP_CACHE_REQUESTS
+
+logger = logging.getLogger('MovieScraper')
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response for bodies served from the disk cache."""
+
+    def __init__(self, url, status_code, headers, content, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+
+class DiskCache:
+    """Persistent response cache: one metadata file and one body file per URL.
+
+    Entries are fresh for `ttl` seconds; stale entries are kept so their
+    validators can be used for conditional requests. When the cache grows
+    beyond `max_bytes` the least recently used bodies are removed. The total
+    size is tracked as bodies are written; the directory is only listed on the
+    first write and when something has to be evicted.
+    """
+
+    def __init__(self, directory=HTTP_CACHE_DIR, ttl=HTTP_CACHE_TTL, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.body'
+
+    def get(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        # Body mtime doubles as the LRU access time
+        try:
+            os.utime(body_path, None)
+        except OSError:
+            # Evicted by another process since the read; the entry we hold is still good
+            pass
+        meta['body'] = body
+        return meta
+
+    def is_fresh(self, entry):
+        return time.time() - entry['stored_at'] < self.ttl
+
+    def _write(self, path, data, mode):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, mode) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def set(self, url, response):
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'status_code': response.status_code,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('Content-Type'),
+            'encoding': response.encoding,
+            'stored_at': time.time()
+        }
+        with self._lock:
+            total = self._size()
+            try:
+                replaced = os.path.getsize(body_path)
+            except OSError:
+                replaced = 0
+            self._write(body_path, response.content, 'wb')
+            self._write(meta_path, json.dumps(meta), 'w')
+            self._total = total + len(response.content) - replaced
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def refresh(self, url, entry):
+        # A 304 revalidated the entry: restart its TTL without rewriting the body
+        meta_path, _ = self._paths(url)
+        meta = {k: v for k, v in entry.items() if k != 'body'}
+        meta['stored_at'] = time.time()
+        with self._lock:
+            self._write(meta_path, json.dumps(meta), 'w')
+
+    def _bodies(self):
+        bodies = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.body'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            bodies.append((stat.st_mtime, stat.st_size, path))
+        return bodies
+
+    def _size(self):
+        if self._total is None:
+            self._total = sum(size for _, size, _ in self._bodies())
+        return self._total
+
+    def _evict(self):
+        # Rescans, which also picks up what other processes sharing the directory wrote or removed
+        bodies = self._bodies()
+        total = sum(size for _, size, _ in bodies)
+        self._total = total
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(bodies):
+            for stale in (path, path[:-len('.body')] + '.json'):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self._total = total
+
+    @staticmethod
+    def to_response(entry):
+        headers = {'Content-Type': entry.get('content_type') or 'text/html'}
+        if entry.get('etag'):
+            headers['ETag'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['Last-Modified'] = entry['last_modified']
+        return CachedResponse(entry['url'], entry['status_code'], headers, entry['body'], entry.get('encoding'))
+
+
+class HttpClient:
+    """Keep-alive session with timeouts, conditional revalidation and a disk cache."""
+
+    def __init__(self, headers=None, timeout=HTTP_TIMEOUT, pool_size=HTTP_POOL_SIZE, cache=None):
+        # Imported on first use so importing the scraper stays cheap
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url, headers=None):
+        entry = self.cache.get(url) if self.cache else None
+        if entry and self.cache.is_fresh(entry):
+            HTTP_CACHE_REQUESTS.inc(result='hit')
+            return DiskCache.to_response(entry)
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry.get('etag'):
+                request_headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request_headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.session.get(url, headers=request_headers, timeout=self.timeout)
+        if response.status_code == 304 and entry:
+            logger.debug(f"Revalidated {url} (304)")
+            self.cache.refresh(url, entry)
+            HTTP_CACHE_REQUESTS.inc(result='revalidated')
+            return DiskCache.to_response(entry)
+        if response.status_code == 200 and self.cache:
+            self.cache.set(url, response)
+        HTTP_CACHE_REQUESTS.inc(result='miss' if self.cache else 'uncached')
+        response.from_cache = False
+        return response
+
+    @contextmanager
+    def stream(self, url, headers=None):
+        """Response whose body is read lazily with iter_content(); the connection is released on exit.
+
+        Bypasses the disk cache, which stores whole bodies.
+        """
+        response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+        HTTP_CACHE_REQUESTS.inc(result='uncached')
+        response.from_cache = False
+        try:
+            yield response
+        finally:
+            response.close()
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client(headers=None):
+    """Process-wide client so every scraper shares one connection pool and cache."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(headers=headers, cache=DiskCache())
+        return _default_client
@@ -0,0 +1,192 @@
+import hashlib
+import re
+
+from sqlalchemy import select
+
+from src.models import PageFingerprint, Showtime
+from src.persistence import BATCH_SIZE, bulk_upsert_showtimes, insert_ignore, local_now, refresh_summaries
+
+# Class tokens of the nodes the listing parsers read; the listing runs from the first to the last of them
+_LISTING_NODE = re.compile(r'class\s*=\s*["\'][^"\']*(?<![\w-])(?:movie-title|showtime|next)(?![\w-])')
+_NOISE = re.compile(r'<script\b.*?</script\s*>|<style\b.*?</style\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+_URL_QUERY = re.compile(r'((?:href|src)\s*=\s*["\'][^"\'?]*)\?[^"\']*')
+_TAG_NAME = re.compile(r'<([\w-]+)')
+_TAG_SPACE = re.compile(r'\s*([<>])\s*')
+_SPACE = re.compile(r'\s+')
+
+
+def listing_slice(html):
+    """The listing part of a page, cut out by string search and normalized.
+
+    Runs from the tag holding the first movie title, showtime or next link to
+    the end of the last one's closing tag, without scripts, styles, comments,
+    URL query strings (cache busters) or layout whitespace. Empty when the page
+    lists nothing.
+    """
+    first = _LISTING_NODE.search(html)
+    if first is None:
+        return ''
+    last = first
+    for last in _LISTING_NODE.finditer(html, first.end()):
+        pass
+    begin = max(html.rfind('<', 0, first.start()), 0)
+    last_open = html.rfind('<', 0, last.start())
+    tag = _TAG_NAME.match(html, last_open) if last_open != -1 else None
+    close = html.find(f'</{tag.group(1)}' if tag else '</', last.end())
+    end = len(html) if close == -1 else html.find('>', close) + 1 or len(html)
+    listing = _NOISE.sub('', html[begin:end])
+    listing = _URL_QUERY.sub(r'\1', listing)
+    return _SPACE.sub(' ', _TAG_SPACE.sub(r'\1', listing)).strip()
+
+
+def page_fingerprint(html):
+    """sha256 of the page's listing slice (see listing_slice); no HTML parsing involved.
+
+    Teasers, banners and scripts around the listing, cache-busting URLs and
+    re-indentation can change without the page counting as changed.
+    """
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    return hashlib.sha256(listing_slice(html).encode('utf-8')).hexdigest()
+
+
+class IncrementalScraper:
+    """Wraps a TheaterScraper so pages whose fingerprint is unchanged are not parsed.
+
+    `known` maps page URL -> (fingerprint, has_next) from the previous crawl.
+    Unchanged pages report no matches but keep pagination going with the stored
+    has_next; changed pages are parsed and collected per page URL.
+    """
+
+    def __init__(self, scraper, known):
+        self.scraper = scraper
+        self.known = known
+        self.changed = {}
+        self.unchanged = set()
+        self.failed = set()
+
+    def targets(self):
+        return self.scraper.targets()
+
+    def fetch(self, full_url):
+        response = self.scraper.fetch(full_url)
+        if response.status_code not in (200, 404):
+            self.failed.add(full_url)
+        return response
+
+    def extract_matches(self, html, url, full_url, movie_name):
+        fingerprint = page_fingerprint(html)
+        if self.is_unchanged(full_url, fingerprint):
+            return [], self.known[full_url][1]
+        results, has_next = self.scraper.extract_matches(html, url, full_url, movie_name)
+        return self.record_changed(full_url, url, fingerprint, results, has_next)
+
+    async def extract_matches_pooled(self, parse_pool, raw, encoding, url, full_url, movie_name):
+        # The fingerprint is a string search, cheap enough for the event loop; unchanged pages never reach the pool
+        fingerprint = page_fingerprint(raw.decode(encoding or 'utf-8', errors='replace'))
+        if self.is_unchanged(full_url, fingerprint):
+            return [], self.known[full_url][1]
+        results, has_next = await self.scraper.extract_matches_pooled(
+            parse_pool, raw, encoding, url, full_url, movie_name
+        )
+        return self.record_changed(full_url, url, fingerprint, results, has_next)
+
+    def is_unchanged(self, full_url, fingerprint):
+        previous = self.known.get(full_url)
+        if previous is not None and previous[0] == fingerprint:
+            self.unchanged.add(full_url)
+            return True
+        return False
+
+    def record_changed(self, full_url, url, fingerprint, results, has_next):
+        self.changed[full_url] = {
+            'target': url,
+            'fingerprint': fingerprint,
+            'has_next': has_next,
+            'records': results or []
+        }
+        return results, has_next
+
+    def vanished_pages(self, target_urls):
+        """Previously seen pages that the listing no longer reaches (e.g. it got shorter).
+
+        Targets with a failed fetch are left alone so an outage does not wipe their data.
+        """
+        failed_targets = {target_of(page_url, target_urls) for page_url in self.failed}
+        vanished = []
+        for page_url in self.known:
+            if page_url in self.changed or page_url in self.unchanged:
+                continue
+            target = target_of(page_url, target_urls)
+            if target is not None and target not in failed_targets:
+                vanished.append(page_url)
+        return vanished
+
+
+def target_of(page_url, target_urls):
+    # Longest prefix wins: https://www.cinemaxx.de/stuttgart is also a prefix of .../stuttgart-si-centrum pages
+    return max((url for url in target_urls if page_url.startswith(url)), key=len, default=None)
+
+
+def load_fingerprints(session, theater_ids):
+    rows = session.execute(
+        select(PageFingerprint.url, PageFingerprint.fingerprint, PageFingerprint.has_next)
+        .where(PageFingerprint.theater_id.in_(list(theater_ids)))
+    ).all()
+    return {url: (fingerprint, has_next) for url, fingerprint, has_next in rows}
+
+
+def apply_page_diffs(session, page_showtimes, vanished, theater_ids, unchanged, now=None):
+    """Applies only what changed to the showtimes table.
+
+    page_showtimes: {page_url: {'target', 'fingerprint', 'has_next', 'showtimes': {(theater_id, movie_id, start)}}}
+    Upcoming showtimes that disappeared from a changed or vanished page are deleted;
+    past showtimes are kept as history. Returns (inserted, deleted).
+    """
+    now = now or local_now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    deleted = 0
+    additions = []
+
+    changed_urls = list(page_showtimes) + list(vanished)
+    existing = {}
+    for start in range(0, len(changed_urls), BATCH_SIZE):
+        rows = session.execute(
+            select(Showtime.id, Showtime.page_url, Showtime.theater_id, Showtime.movie_id, Showtime.showtime)
+            .where(Showtime.page_url.in_(changed_urls[start:start + BATCH_SIZE]))
+            .where(Showtime.showtime >= today)
+        ).all()
+        for row in rows:
+            existing.setdefault(row.page_url, {})[(row.theater_id, row.movie_id, row.showtime)] = row.id
+
+    # Deletions first, so a showtime that moved to another page is re-inserted there
+    stale = {}
+    for page_url in changed_urls:
+        current = page_showtimes.get(page_url, {}).get('showtimes', set())
+        old = existing.get(page_url, {})
+        stale.update((key, row_id) for key, row_id in old.items() if key not in current)
+        additions.extend((*key, page_url) for key in current if key not in old)
+    stale_ids = list(stale.values())
+    for start in range(0, len(stale_ids), BATCH_SIZE):
+        deleted += session.query(Showtime).filter(Showtime.id.in_(stale_ids[start:start + BATCH_SIZE])).delete(
+            synchronize_session=False
+        )
+    # Days that only lost showtimes; bulk_upsert_showtimes refreshes the ones that gained some
+    refresh_summaries(session, list(stale))
+    inserted = bulk_upsert_showtimes(session, additions)
+
+    fingerprints = [
+        {'url': page_url, 'theater_id': theater_ids[page['target']], 'fingerprint': page['fingerprint'],
+         'has_next': page['has_next'], 'changed_at': now, 'checked_at': now}
+        for page_url, page in page_showtimes.items()
+    ]
+    if vanished or fingerprints:
+        session.query(PageFingerprint).filter(
+            PageFingerprint.url.in_(list(vanished) + [row['url'] for row in fingerprints])
+        ).delete(synchronize_session=False)
+    insert_ignore(session, PageFingerprint, fingerprints, ['url'])
+    if unchanged:
+        session.query(PageFingerprint).filter(PageFingerprint.url.in_(list(unchanged))).update(
+            {PageFingerprint.checked_at: now}, synchronize_session=False
+        )
+    return inserted, deleted
@@ -1,24 +1,96 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
-
-def setup_logging():
-    # Create logs directory if it doesn't exist
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
-        
-    # Configure logging
-    log_filename = f'logs/movie_scraper_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_filename),
-            logging.StreamHandler()
-        ]
-    )
-    
-    # Create logger
-    logger = logging.getLogger('MovieScraper')
-    return logger
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+
+from src.constants import LOG_BACKUP_COUNT, LOG_DIR, LOG_MAX_BYTES
+
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'logger': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DebugSampler(logging.Filter):
+    """Keeps only a fraction of DEBUG records; INFO and above always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+def setup_logging(level=logging.INFO, json_format=False, rotate_when=None, debug_sample_rate=1.0,
+                  log_dir=LOG_DIR, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """Routes all logging through a queue so callers never block on file or console I/O.
+
+    A background QueueListener writes to a rotating file (by size, or by time when
+    rotate_when is given, e.g. 'midnight') and to the console. Safe to call more
+    than once; only the first call configures handlers.
+    """
+    global _listener
+    with _lock:
+        logger = logging.getLogger('MovieScraper')
+        if _listener is not None:
+            return logger
+
+        os.makedirs(log_dir, exist_ok=True)
+        log_filename = os.path.join(log_dir, 'movie_scraper.log')
+        if rotate_when:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                log_filename, when=rotate_when, backupCount=backup_count, encoding='utf-8'
+            )
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+        formatter = JsonFormatter() if json_format else logging.Formatter(FORMAT)
+        output_handlers = [file_handler, logging.StreamHandler()]
+        for handler in output_handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        if debug_sample_rate < 1.0:
+            queue_handler.addFilter(DebugSampler(debug_sample_rate))
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+        _listener.start()
+        # Flush whatever is still queued when the process exits
+        atexit.register(shutdown_logging)
+        return logger
+
+
+def shutdown_logging():
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
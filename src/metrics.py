@@ -0,0 +1,184 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds; covers cache hits (sub-ms) up to a stalled theater site
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in key) + '}'
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # One slot per bucket, then sum and count
+                counts = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, counts in self._values.items():
+                for bound, count in zip(self.buckets, counts):
+                    samples.append((f'{self.name}_bucket', key + (('le', repr(float(bound))),), count))
+                samples.append((f'{self.name}_bucket', key + (('le', '+Inf'),), counts[-1]))
+                samples.append((f'{self.name}_sum', key, counts[-2]))
+                samples.append((f'{self.name}_count', key, counts[-1]))
+        return samples
+
+
+class Registry:
+    """Process-wide metrics, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text):
+        metric = Counter(name, help_text)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, func):
+        """Registers func() -> [(name, type, help, [(labels dict, value)])], evaluated at scrape time."""
+        self._collectors.append(func)
+        return func
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, key, value in metric.samples():
+                lines.append(f'{name}{_format_labels(key)} {value}')
+        for func in self._collectors:
+            for name, metric_type, help_text, samples in func():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(_label_key(labels))} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+SCRAPE_PHASE_SECONDS = registry.histogram(
+    'showtime_scrape_phase_seconds',
+    'Time per listing page and phase (wait = DNS/connect/server time until headers, download, cache, parse, match)'
+)
+SCRAPE_THEATER_SECONDS = registry.histogram('showtime_scrape_theater_seconds', 'Time to scrape all pages of one theater listing')
+SCRAPE_PAGES = registry.counter('showtime_scrape_pages_total', 'Listing pages fetched')
+SCRAPE_ERRORS = registry.counter('showtime_scrape_errors_total', 'Failed listing fetches by kind')
+SCRAPE_RETRIES = registry.counter('showtime_scrape_retries_total', 'Listing fetches retried after 429/5xx or network errors')
+SCRAPE_FALLBACKS = registry.counter('showtime_scrape_fallbacks_total', 'Theater listings answered with last-known results')
+SCRAPE_RESULTS = registry.counter('showtime_scrape_results_total', 'Matching listings found')
+HTTP_CACHE_REQUESTS = registry.counter('showtime_http_cache_requests_total', 'HTTP requests by disk cache outcome')
+SEARCH_SECONDS = registry.histogram('showtime_search_seconds', 'End-to-end search time by source')
+
+
+# Optional per-request trace; spans are only recorded while a trace is active
+_current_trace = ContextVar('showtime_trace', default=None)
+
+
+class Trace:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, name, start, duration, attrs):
+        with self._lock:
+            self.spans.append({'name': name, 'start_ms': (start - self.started) * 1000, 'duration_ms': duration * 1000, **attrs})
+
+    def totals(self):
+        totals = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span['name']] = totals.get(span['name'], 0.0) + span['duration_ms']
+        return totals
+
+
+def start_trace(name):
+    trace = Trace(name)
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+
+@contextmanager
+def timed(histogram, span=None, **labels):
+    """Observes the block's duration in histogram and, when tracing, records a span."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        histogram.observe(duration, **labels)
+        trace = _current_trace.get()
+        if trace is not None and span:
+            trace.add(span, start, duration, labels)
+
+
+def record_span(name, start, duration, **attrs):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, start, duration, attrs)
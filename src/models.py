@@ -1,8 +1,13 @@
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, inspect, text, Boolean, Column, Date, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, scoped_session, sessionmaker, Session as OrmSession
+import logging
 import os
+import threading
+
+from src.constants import DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT, DEFAULT_DATABASE_URL
 
 Base = declarative_base()
 
@@ -11,15 +16,16 @@ class Theater(Base):
     
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
-    url = Column(String, nullable=False)
+    url = Column(String, nullable=False, unique=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    last_crawled_at = Column(DateTime)
     showtimes = relationship('Showtime', back_populates='theater')
 
 class Movie(Base):
     __tablename__ = 'movies'
     
     id = Column(Integer, primary_key=True)
-    title = Column(String, nullable=False)
+    title = Column(String, nullable=False, unique=True, index=True)
     language = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     showtimes = relationship('Showtime', back_populates='movie')
@@ -32,13 +38,217 @@ class Showtime(Base):
     movie_id = Column(Integer, ForeignKey('movies.id'))
     showtime = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Listing page the showtime was scraped from, so page diffs can remove it again
+    page_url = Column(String, index=True)
     
     theater = relationship('Theater', back_populates='showtimes')
     movie = relationship('Movie', back_populates='showtimes')
 
+    __table_args__ = (
+        # Makes re-crawls idempotent and backs the bulk upsert's ON CONFLICT target
+        UniqueConstraint('theater_id', 'movie_id', 'showtime', name='uq_showtimes_theater_movie_showtime'),
+        Index('ix_showtimes_showtime', 'showtime'),
+    )
+
+class PageFingerprint(Base):
+    __tablename__ = 'page_fingerprints'
+
+    id = Column(Integer, primary_key=True)
+    url = Column(String, nullable=False, unique=True)
+    theater_id = Column(Integer, ForeignKey('theaters.id'), index=True)
+    fingerprint = Column(String(64), nullable=False)
+    has_next = Column(Boolean, default=False)
+    changed_at = Column(DateTime, default=datetime.utcnow)
+    checked_at = Column(DateTime, default=datetime.utcnow)
+
+class ShowtimeSummary(Base):
+    """Showtimes of one movie at one theater on one day, kept in step with the showtimes table.
+
+    Maintained by the write helpers in src/persistence.py so searches read one
+    row per theater and day instead of joining and grouping every showtime.
+    """
+    __tablename__ = 'showtime_summaries'
+
+    id = Column(Integer, primary_key=True)
+    movie_id = Column(Integer, ForeignKey('movies.id'), nullable=False)
+    theater_id = Column(Integer, ForeignKey('theaters.id'), nullable=False)
+    day = Column(Date, nullable=False)
+    showtimes = Column(Integer, nullable=False)
+    first_showtime = Column(DateTime, nullable=False)
+    # 'HH:MM, HH:MM, ...' in start order
+    times = Column(String, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('movie_id', 'theater_id', 'day', name='uq_showtime_summaries_movie_theater_day'),
+        Index('ix_showtime_summaries_theater_day', 'theater_id', 'day'),
+    )
+
+_engine = None
+_engine_lock = threading.Lock()
+
+# Thread-local sessions shared by Flask request handlers, Streamlit reruns and the crawler.
+# Bound to the process-wide engine on first use of get_engine().
+Session = scoped_session(sessionmaker())
+
+
+def get_database_url():
+    # Fall back to a local SQLite file so everything runs without PostgreSQL
+    return os.environ.get('DATABASE_URL') or DEFAULT_DATABASE_URL
+
+
+def _create_engine(database_url):
+    if database_url.startswith('sqlite'):
+        engine = create_engine(database_url, connect_args={'check_same_thread': False})
+
+        @event.listens_for(engine, 'connect')
+        def _sqlite_pragmas(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA foreign_keys=ON')
+            cursor.close()
+
+        return engine
+    return create_engine(
+        database_url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True
+    )
+
+
+def get_engine():
+    """Process-wide engine; created once, then reused by every caller."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = _create_engine(get_database_url())
+            Session.configure(bind=_engine)
+        return _engine
+
+
+@contextmanager
+def session_scope(session_factory=None):
+    """Commits on success, rolls back on error and releases the thread's session.
+
+    With a session_factory (e.g. a sessionmaker bound to another engine) a
+    session from it is used and closed instead of the shared one.
+    """
+    if session_factory is None:
+        get_engine()
+        session = Session()
+    else:
+        session = session_factory()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        if session_factory is None:
+            Session.remove()
+        else:
+            session.close()
+
+
+def pool_status():
+    pool = get_engine().pool
+    status = {'pool_class': type(pool).__name__}
+    for metric in ('size', 'checkedin', 'checkedout', 'overflow'):
+        if hasattr(pool, metric):
+            status[metric] = getattr(pool, metric)()
+    return status
+
+
+def dispose_engine():
+    """Drops pooled connections, e.g. after forking worker processes."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            Session.remove()
+            _engine.dispose()
+            _engine = None
+
+
+logger = logging.getLogger('MovieScraper')
+
+# Columns added to tables that older releases already created: (table, column, DDL type)
+ADDED_COLUMNS = [
+    ('theaters', 'last_crawled_at', 'TIMESTAMP'),
+    ('showtimes', 'page_url', 'VARCHAR'),
+]
+# Indexes create_all only builds with a new table: (name, table, columns, unique)
+ADDED_INDEXES = [
+    ('uq_theaters_url', 'theaters', ['url'], True),
+    ('ix_movies_title', 'movies', ['title'], True),
+    ('uq_showtimes_theater_movie_showtime', 'showtimes', ['theater_id', 'movie_id', 'showtime'], True),
+    ('ix_showtimes_showtime', 'showtimes', ['showtime'], False),
+    ('ix_showtimes_page_url', 'showtimes', ['page_url'], False),
+]
+# Duplicates the unique indexes would reject; theater and movie references are merged into the oldest row first
+DEDUPLICATE = [
+    "UPDATE showtimes SET theater_id = (SELECT MIN(t2.id) FROM theaters t1 JOIN theaters t2 ON t2.url = t1.url "
+    "WHERE t1.id = showtimes.theater_id)",
+    "DELETE FROM theaters WHERE id NOT IN (SELECT MIN(id) FROM theaters GROUP BY url)",
+    "UPDATE showtimes SET movie_id = (SELECT MIN(m2.id) FROM movies m1 JOIN movies m2 ON m2.title = m1.title "
+    "WHERE m1.id = showtimes.movie_id)",
+    "DELETE FROM movies WHERE id NOT IN (SELECT MIN(id) FROM movies GROUP BY title)",
+    "DELETE FROM showtimes WHERE id NOT IN (SELECT MIN(id) FROM showtimes GROUP BY theater_id, movie_id, showtime)",
+]
+
+
+def _has_index(inspector, table, columns, unique):
+    indexes = inspector.get_indexes(table)
+    if unique:
+        indexes = [index for index in indexes if index.get('unique')] + inspector.get_unique_constraints(table)
+    return any(list(index['column_names']) == columns for index in indexes)
+
+
+def upgrade_schema(engine):
+    """Brings tables created by older releases up to the current models.
+
+    create_all() only creates missing tables, so columns and unique indexes
+    added since are applied here. Duplicate rows that a new unique index would
+    reject are merged first. Returns the statements that were run.
+    """
+    inspector = inspect(engine)
+    statements = []
+    for table, column, ddl_type in ADDED_COLUMNS:
+        if inspector.has_table(table) and column not in {c['name'] for c in inspector.get_columns(table)}:
+            statements.append(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}")
+    missing = [
+        (name, table, columns, unique) for name, table, columns, unique in ADDED_INDEXES
+        if inspector.has_table(table) and not _has_index(inspector, table, columns, unique)
+    ]
+    if any(unique for _, _, _, unique in missing):
+        statements.extend(DEDUPLICATE)
+    statements.extend(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({', '.join(columns)})"
+        for name, table, columns, unique in missing
+    )
+    if not statements:
+        return []
+    logger.warning(f"Upgrading database schema: {len(statements)} statements")
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+    return statements
+
+
 # Create database tables
 def init_db():
-    database_url = os.environ.get('DATABASE_URL')
-    if database_url:
-        engine = create_engine(database_url)
-        Base.metadata.create_all(engine)
+    engine = get_engine()
+    backfill = not inspect(engine).has_table(ShowtimeSummary.__tablename__)
+    upgrade_schema(engine)
+    Base.metadata.create_all(engine)
+    if backfill:
+        # Databases created before the summary table get it filled from their showtimes once
+        from src.persistence import rebuild_summaries
+
+        with OrmSession(engine) as session:
+            rebuild_summaries(session)
+            session.commit()
+    return engine
@@ -1,12 +1,14 @@
-# Language: Python
-# filepath: /home/student4/repositories/Private_Repo/Showtime-Finder/movie_scraper.py
-import streamlit as st
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
-import json
-import trafilatura
+# Scraping core: no UI imports here, see streamlit_app.py for the Streamlit front end
+import logging
 import time
+from src.constants import PREFETCH_PAGES
+from src.html_parsers import get_parser
+from src.http_client import get_default_client
+from src.metrics import SCRAPE_PHASE_SECONDS, SCRAPE_RESULTS, record_span
+from src.parse_pool import parse_listing
+from src.scrape_engine import AsyncScrapeEngine
+
+logger = logging.getLogger('MovieScraper')
 
 # Base URLs for theaters
 base_urls = {
@@ -32,86 +34,106 @@ pagination_params = {
 
 
 class TheaterScraper:
-    def __init__(self):
+    def __init__(self, parser=None, urls=None, page_params=None, http=None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         # Set base URLs and pagination parameters
-        self.base_urls = base_urls
-        self.pagination_params = pagination_params
+        self.base_urls = urls or base_urls
+        self.pagination_params = page_params or pagination_params
+        # Shared keep-alive session with on-disk HTTP cache
+        self.http = http or get_default_client(self.headers)
+        # Fastest installed HTML backend unless one is named (see src/html_parsers.py)
+        self.parser = get_parser(parser)
+
+    def targets(self):
+        # (theater key, base url, pagination pattern) for every page listing we crawl
+        for theater, urls in self.base_urls.items():
+            if isinstance(urls, str):
+                urls = [urls]
+            for url in urls:
+                yield theater, url, self.pagination_params[theater]
+
+    def fetch(self, full_url):
+        return self.http.get(full_url)
+
+    def extract_matches(self, html, url, full_url, movie_name):
+        """Returns (matches, has_next); matches is None when the page lists no movies.
+
+        With movie_name=None every listed movie is returned (used by the crawler).
+        """
+        return self.build_results(*parse_listing(self.parser, html, movie_name), url, full_url)
+
+    async def extract_matches_pooled(self, parse_pool, raw, encoding, url, full_url, movie_name):
+        # Same as extract_matches, with the parse/match stage in a worker process
+        outcome = await parse_pool.parse(self.parser.name, raw, encoding, movie_name)
+        return self.build_results(*outcome, url, full_url)
+
+    def build_results(self, matches, has_next, parse_seconds, match_seconds, url, full_url):
+        """Records the parse/match timings and expands compact matches into result dicts."""
+        now = time.perf_counter()
+        SCRAPE_PHASE_SECONDS.observe(parse_seconds, theater=url, phase='parse')
+        record_span('parse', now - parse_seconds - match_seconds, parse_seconds, theater=url, phase='parse')
+        if matches is None:
+            return None, False
+        SCRAPE_PHASE_SECONDS.observe(match_seconds, theater=url, phase='match')
+        record_span('match', now - match_seconds, match_seconds, theater=url, phase='match')
+        results = [
+            {
+                'theater': url,
+                'title': title,
+                'times': times or 'Check website for times',
+                'link': full_url
+            }
+            for title, times in matches
+        ]
+        SCRAPE_RESULTS.inc(len(results), theater=url)
+        return results, has_next
 
-    def paginated_scrape(self, url, page_param, movie_name, max_pages=5):
+    def paginated_scrape(self, url, page_param, movie_name, max_pages=5, prefetch=False):
+        if prefetch:
+            # Request every page concurrently instead of following 'next' links
+            return AsyncScrapeEngine(self, max_pages=max_pages, prefetch=True).run_target(url, page_param, movie_name)
         all_results = []
         page = 1
         while page <= max_pages:
             full_url = f"{url}{page_param.format(page)}"
-            response = requests.get(full_url, headers=self.headers)
+            response = self.fetch(full_url)
             if response.status_code != 200:
+                if response.status_code != 404:
+                    logger.warning(f"Stopping {url} at {full_url}: HTTP {response.status_code}")
                 break
-            soup = BeautifulSoup(response.text, 'html.parser')
-            movies = soup.find_all('div', class_='movie-title')
-            if not movies:
+            results, has_next = self.extract_matches(response.text, url, full_url, movie_name)
+            if results is None:
                 break
-            for movie in movies:
-                if movie_name.lower() in movie.text.lower():
-                    all_results.append({
-                        'theater': url,
-                        'times': 'Check website for times',
-                        'link': full_url
-                    })
-            next_page = soup.find('a', class_='next')
-            if not next_page:
+            all_results.extend(results)
+            if not has_next:
                 break
             page += 1
             time.sleep(1)  # Be nice to servers
         return all_results
 
-    def scrape_all_theaters(self, movie_name):
-        all_showtimes = []
-        # Scrape CinemaxX
-        for url in self.base_urls['cinemaxx']:
-            results = self.paginated_scrape(url, self.pagination_params['cinemaxx'], movie_name)
-            all_showtimes.extend(results)
-        # Scrape Capitol
-        results = self.paginated_scrape(self.base_urls['capitol'],
-                                        self.pagination_params['capitol'],
-                                        movie_name)
-        all_showtimes.extend(results)
-        # Scrape Traumpalast
-        for url in self.base_urls['traumpalast']:
-            results = self.paginated_scrape(url,
-                                        self.pagination_params['traumpalast'],
-                                        movie_name)
-            all_showtimes.extend(results)
-        # Scrape Lokah Films
-        results = self.paginated_scrape(self.base_urls['lokahfilms'],
-                                        self.pagination_params['lokahfilms'],
-                                        movie_name)
-        all_showtimes.extend(results)
-        return all_showtimes
-
-
-def main():
-    st.title("Stuttgart Movie Showtimes Finder")
-    st.write("Search for movie showtimes in Stuttgart theaters (specialized in Indian movies)")
-
-    movie_name = st.text_input("Enter movie name:", "")
-
-    if st.button("Search Showtimes"):
-        if movie_name:
-            scraper = TheaterScraper()
-            with st.spinner('Searching for showtimes...'):
-                all_showtimes = scraper.scrape_all_theaters(movie_name)
-
-                if all_showtimes:
-                    st.success("Found showtimes!")
-                    for show in all_showtimes:
-                        st.subheader(show['theater'])
-                        st.write(f"Showtimes: {show.get('times', 'Check website for times')}")
-                        st.markdown(f"[More Info]({show['link']})")
-                else:
-                    st.warning(f"No showtimes found for '{movie_name}'. Try another movie name or check back later.")
+    async def scrape_all_theaters_async(self, movie_name, max_pages=5, prefetch=PREFETCH_PAGES):
+        return await AsyncScrapeEngine(self, max_pages=max_pages, prefetch=prefetch).scrape_all(movie_name)
+
+    def scrape_all_theaters(self, movie_name, max_pages=5, prefetch=PREFETCH_PAGES):
+        # Synchronous wrapper kept for the Streamlit and Flask front ends
+        return AsyncScrapeEngine(self, max_pages=max_pages, prefetch=prefetch).run(movie_name)
+
+    def stream_all_theaters(self, movie_name, max_pages=5, prefetch=PREFETCH_PAGES):
+        # Per-target events in completion order, so fast theaters show up first
+        return AsyncScrapeEngine(self, max_pages=max_pages, prefetch=prefetch).stream(movie_name)
+
+
+def scrape_movie_info(movie_name):
+    return TheaterScraper().scrape_all_theaters(movie_name)
+
+
+def stream_movie_info(movie_name):
+    return TheaterScraper().stream_all_theaters(movie_name)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # The Streamlit UI lives in streamlit_app.py; kept for `streamlit run src/movie_scraper.py`
+    from streamlit_app import main
+    main()
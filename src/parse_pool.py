@@ -0,0 +1,73 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.html_parsers import get_parser
+from src.title_index import title_matches
+
+# One parser per backend per worker process, built on first use
+_worker_parsers = {}
+
+
+def parse_listing(parser, html, movie_name):
+    """Parse/match stage: returns (matches, has_next, parse_s, match_s).
+
+    matches is a list of compact (title, times) tuples, or None when the page
+    lists no movies. With movie_name=None every listing matches.
+    """
+    start = time.perf_counter()
+    page = parser.parse(html)
+    parsed = time.perf_counter()
+    if not page.movies:
+        return None, False, parsed - start, 0.0
+    matches = [
+        (title, times) for title, times in page.movies
+        if movie_name is None or title_matches(movie_name, title)
+    ]
+    return matches, page.has_next, parsed - start, time.perf_counter() - parsed
+
+
+def parse_in_worker(parser_name, raw, encoding, movie_name):
+    # Runs in a pool process: only raw bytes go in and only match tuples come back
+    if parser_name not in _worker_parsers:
+        _worker_parsers[parser_name] = get_parser(parser_name)
+    html = raw.decode(encoding or 'utf-8', errors='replace')
+    return parse_listing(_worker_parsers[parser_name], html, movie_name)
+
+
+class ParsePool:
+    """Process pool for the CPU-bound parse/match stage of a crawl.
+
+    HTML parsing holds the GIL, so with many theaters in flight a single core
+    becomes the bottleneck; worker processes let parsing use every core while
+    the event loop keeps fetching.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    async def parse(self, parser_name, raw, encoding, movie_name):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor(), parse_in_worker, parser_name, raw, encoding, movie_name)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
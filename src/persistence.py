@@ -0,0 +1,173 @@
+from datetime import datetime, time, timedelta
+from itertools import groupby
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select, tuple_
+
+from src.constants import THEATER_TIMEZONE
+from src.models import Movie, Showtime, ShowtimeSummary, Theater
+
+BATCH_SIZE = 1000
+
+
+def local_now():
+    """Current wall-clock time at the theaters, naive like the stored showtimes (not utcnow)."""
+    try:
+        return datetime.now(ZoneInfo(THEATER_TIMEZONE)).replace(tzinfo=None)
+    except ZoneInfoNotFoundError:
+        # No time zone database (Windows without tzdata): the server's clock is the best guess
+        return datetime.now()
+
+
+def local_today():
+    """Midnight starting the theaters' current day; showtimes before it are history."""
+    return local_now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _dialect_insert(session):
+    name = session.get_bind().dialect.name
+    if name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def _batches(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def insert_ignore(session, model, rows, conflict_columns, batch_size=BATCH_SIZE):
+    """Inserts rows, silently skipping those that collide on conflict_columns.
+
+    Uses one INSERT ... ON CONFLICT DO NOTHING per batch on PostgreSQL and
+    SQLite; other databases get a key lookup followed by bulk inserts.
+    """
+    if not rows:
+        return
+    insert = _dialect_insert(session)
+    table = model.__table__
+    for batch in _batches(rows, batch_size):
+        if insert is not None:
+            session.execute(insert(table).values(batch).on_conflict_do_nothing(index_elements=conflict_columns))
+            continue
+        columns = [table.c[name] for name in conflict_columns]
+        keys = {tuple(row[name] for name in conflict_columns) for row in batch}
+        existing = set(session.execute(select(*columns).where(tuple_(*columns).in_(keys))).all())
+        missing = [row for row in batch if tuple(row[name] for name in conflict_columns) not in existing]
+        if missing:
+            session.bulk_insert_mappings(model, missing)
+
+
+def upsert_theaters(session, theaters, crawled_at=None):
+    """theaters: {url: name}. Stamps last_crawled_at and returns {url: id}."""
+    if not theaters:
+        return {}
+    crawled_at = crawled_at or datetime.utcnow()
+    rows = [{'url': url, 'name': name, 'last_crawled_at': crawled_at} for url, name in theaters.items()]
+    insert = _dialect_insert(session)
+    if insert is not None:
+        statement = insert(Theater.__table__).values(rows)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=['url'],
+            set_={'last_crawled_at': statement.excluded.last_crawled_at}
+        ))
+    else:
+        insert_ignore(session, Theater, rows, ['url'])
+        session.query(Theater).filter(Theater.url.in_(list(theaters))).update(
+            {Theater.last_crawled_at: crawled_at}, synchronize_session=False
+        )
+    return dict(session.execute(select(Theater.url, Theater.id).where(Theater.url.in_(list(theaters)))).all())
+
+
+def upsert_movies(session, titles):
+    """Returns {title: id}, creating movies that do not exist yet."""
+    titles = sorted(set(titles))
+    if not titles:
+        return {}
+    now = datetime.utcnow()
+    insert_ignore(session, Movie, [{'title': title, 'created_at': now} for title in titles], ['title'])
+    ids = {}
+    for batch in _batches(titles, BATCH_SIZE):
+        ids.update(session.execute(select(Movie.title, Movie.id).where(Movie.title.in_(batch))).all())
+    return ids
+
+
+def bulk_upsert_showtimes(session, showtimes, batch_size=BATCH_SIZE):
+    """showtimes: iterable of (theater_id, movie_id, datetime[, page_url]); duplicates are ignored."""
+    now = datetime.utcnow()
+    rows = [
+        {'theater_id': row[0], 'movie_id': row[1], 'showtime': row[2], 'page_url': row[3] if len(row) > 3 else None,
+         'created_at': now}
+        for row in set(showtimes)
+    ]
+    insert_ignore(session, Showtime, rows, ['theater_id', 'movie_id', 'showtime'], batch_size)
+    refresh_summaries(session, [(row['theater_id'], row['movie_id'], row['showtime']) for row in rows], batch_size)
+    return len(rows)
+
+
+def _summary_rows(showtimes, now):
+    """Groups (theater_id, movie_id, showtime) rows, sorted by theater, movie and start, into summary rows."""
+    for (theater_id, movie_id, day), group in groupby(showtimes, key=lambda row: (row[0], row[1], row[2].date())):
+        starts = [row[2] for row in group]
+        yield {
+            'theater_id': theater_id,
+            'movie_id': movie_id,
+            'day': day,
+            'showtimes': len(starts),
+            'first_showtime': starts[0],
+            'times': ', '.join(f"{start:%H:%M}" for start in starts),
+            'updated_at': now
+        }
+
+
+def refresh_summaries(session, showtimes, batch_size=BATCH_SIZE):
+    """Recomputes the summary rows of every (theater, movie, day) touched by the given showtimes.
+
+    showtimes: iterable of (theater_id, movie_id, datetime) that were inserted or deleted.
+    Only the affected days are re-read from the showtimes table, so the cost
+    follows the size of the change, not of the history.
+    """
+    days = {}
+    for theater_id, movie_id, start in showtimes:
+        days.setdefault((theater_id, movie_id), set()).add(start.date())
+    if not days:
+        return
+    now = datetime.utcnow()
+    for batch in _batches(sorted(days), batch_size):
+        first = min(min(days[pair]) for pair in batch)
+        last = max(max(days[pair]) for pair in batch)
+        pairs = tuple_(Showtime.theater_id, Showtime.movie_id).in_(batch)
+        rows = session.execute(
+            select(Showtime.theater_id, Showtime.movie_id, Showtime.showtime)
+            .where(pairs)
+            .where(Showtime.showtime >= datetime.combine(first, time.min))
+            .where(Showtime.showtime < datetime.combine(last + timedelta(days=1), time.min))
+            .order_by(Showtime.theater_id, Showtime.movie_id, Showtime.showtime)
+        ).all()
+        # Other days of a pair inside [first, last] are recomputed too; they are rebuilt from the same rows
+        session.query(ShowtimeSummary).filter(
+            tuple_(ShowtimeSummary.theater_id, ShowtimeSummary.movie_id).in_(batch),
+            ShowtimeSummary.day >= first,
+            ShowtimeSummary.day <= last
+        ).delete(synchronize_session=False)
+        summaries = list(_summary_rows(rows, now))
+        if summaries:
+            session.bulk_insert_mappings(ShowtimeSummary, summaries)
+
+
+def rebuild_summaries(session, batch_size=BATCH_SIZE):
+    """Rebuilds the whole summary table from the showtimes table; returns the number of summary rows."""
+    session.query(ShowtimeSummary).delete(synchronize_session=False)
+    rows = session.execute(
+        select(Showtime.theater_id, Showtime.movie_id, Showtime.showtime)
+        .order_by(Showtime.theater_id, Showtime.movie_id, Showtime.showtime)
+        .execution_options(yield_per=batch_size)
+    )
+    summaries = list(_summary_rows(rows, datetime.utcnow()))
+    for batch in _batches(summaries, batch_size):
+        session.bulk_insert_mappings(ShowtimeSummary, batch)
+    return len(summaries)
@@ -0,0 +1,169 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from src.constants import (
+    ADAPTIVE_MAX_INTERVAL, BREAKER_COOLDOWN, BREAKER_FAILURES, LAST_KNOWN_SIZE, RETRY_BACKOFF, RETRY_MAX_BACKOFF
+)
+
+# Responses that mean "slow down / try again later" rather than "no such page"
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """A host is short-circuited after repeated failures."""
+
+
+class FetchFailed(Exception):
+    """A page kept failing with a retryable status after all retries."""
+
+    def __init__(self, url, status_code):
+        super().__init__(f"HTTP {status_code} from {url}")
+        self.status_code = status_code
+
+
+def backoff_delay(attempt, retry_after=None, base=RETRY_BACKOFF, cap=RETRY_MAX_BACKOFF):
+    """Full-jitter exponential backoff; a server's Retry-After wins when it is longer."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+def retry_after_seconds(response):
+    value = response.headers.get('Retry-After') if response is not None else None
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        # HTTP-date form; not worth parsing for theater sites
+        return None
+
+
+class HostHealth:
+    """AIMD-tuned request budget of one host, shared by every engine in the process.
+
+    Healthy responses add to the concurrency limit (about +1 per `limit`
+    responses) and halve the spacing between requests; 429/5xx and network
+    errors halve the limit and double the spacing. Like TCP, a burst of
+    failures from requests already in flight counts as a single decrease.
+    """
+
+    def __init__(self, min_interval, max_concurrency, max_interval=ADAPTIVE_MAX_INTERVAL):
+        self.min_interval = min_interval
+        self.max_concurrency = max_concurrency
+        self.max_interval = max_interval
+        self.limit = 1.0
+        self.interval = min_interval
+        self.not_before = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def concurrency(self):
+        return max(1, min(self.max_concurrency, int(self.limit)))
+
+    def on_success(self):
+        with self._lock:
+            self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            self.interval = max(self.min_interval, self.interval / 2)
+
+    def on_overload(self, retry_after=None):
+        now = time.monotonic()
+        with self._lock:
+            if retry_after:
+                self.not_before = max(self.not_before, now + min(retry_after, self.max_interval))
+            if now - self._last_decrease < max(self.interval, 1.0):
+                return
+            self._last_decrease = now
+            self.limit = max(1.0, self.limit / 2)
+            self.interval = min(self.max_interval, max(self.interval * 2, self.min_interval, 0.25))
+
+
+class CircuitBreaker:
+    """Per-host breaker: opens after `failures` consecutive failed requests, for `cooldown` seconds.
+
+    After the cool-down one trial request is let through (half-open); its
+    outcome closes the breaker again or restarts the cool-down. A trial whose
+    outcome is never recorded expires after another cool-down, so a caller
+    that forgets to report back cannot lock the host out for good.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        # host -> (consecutive failures, opened_at or None, trial started_at or None)
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def allow(self, host):
+        with self._lock:
+            failures, opened_at, trial_at = self._state.get(host, (0, None, None))
+            if opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - opened_at < self.cooldown:
+                return False
+            if trial_at is not None and now - trial_at < self.cooldown:
+                return False
+            self._state[host] = (failures, opened_at, now)
+            return True
+
+    def record_success(self, host):
+        with self._lock:
+            self._state.pop(host, None)
+
+    def record_failure(self, host):
+        with self._lock:
+            failures, opened_at, trial_at = self._state.get(host, (0, None, None))
+            failures += 1
+            if trial_at is not None or failures >= self.failures:
+                self._state[host] = (failures, time.monotonic(), None)
+            else:
+                self._state[host] = (failures, opened_at, None)
+
+    def release(self, host):
+        """Ends a half-open trial without an outcome, e.g. when its request was abandoned."""
+        with self._lock:
+            failures, opened_at, trial_at = self._state.get(host, (0, None, None))
+            if trial_at is not None:
+                self._state[host] = (failures, opened_at, None)
+
+    def is_open(self, host):
+        with self._lock:
+            return self._state.get(host, (0, None, None))[1] is not None
+
+    def cooling_down(self, host):
+        """True while the host is open and its cool-down has not elapsed (no trial allowed yet)."""
+        with self._lock:
+            opened_at = self._state.get(host, (0, None, None))[1]
+            return opened_at is not None and time.monotonic() - opened_at < self.cooldown
+
+    def open_hosts(self):
+        with self._lock:
+            return sorted(host for host, (_, opened_at, _) in self._state.items() if opened_at is not None)
+
+
+class LastKnownResults:
+    """Most recent successful results per (listing URL, query), served while a theater is down."""
+
+    def __init__(self, maxsize=LAST_KNOWN_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set(self, url, movie_name, results):
+        with self._lock:
+            self._entries[(url, movie_name)] = (results, time.time())
+            self._entries.move_to_end((url, movie_name))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, url, movie_name):
+        """Returns (results, stored_at) or None."""
+        with self._lock:
+            return self._entries.get((url, movie_name))
+
+
+circuit_breaker = CircuitBreaker()
+last_known_results = LastKnownResults()
@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import OrderedDict
+
+from src.constants import SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL
+from src.title_index import normalize
+
+
+def normalize_query(movie_name):
+    # Same folding as the title index, so 'Leo', ' leo ' and 'LEO' share one entry
+    return ' '.join(normalize(movie_name)) or movie_name.strip().casefold()
+
+
+class FlightAbandoned(Exception):
+    """The caller leading a streamed computation went away before it finished."""
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'events', 'changed')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # Events relayed by a streaming leader, replayed and followed by joiners
+        self.events = []
+        self.changed = threading.Condition()
+
+    def publish(self, event):
+        with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    def finish(self):
+        with self.changed:
+            self.done.set()
+            self.changed.notify_all()
+
+    def follow(self):
+        """Yields every event published so far and then each new one, until the flight is done."""
+        seen = 0
+        while True:
+            with self.changed:
+                while seen == len(self.events) and not self.done.is_set():
+                    self.changed.wait()
+                pending = self.events[seen:]
+                finished = self.done.is_set()
+            seen += len(pending)
+            yield from pending
+            if finished and seen == len(self.events):
+                return
+
+
+class SearchCache:
+    """Bounded LRU cache with per-entry TTL and single-flight computation.
+
+    Concurrent get_or_compute() calls for the same key run `compute` once;
+    the other callers block until the leader finishes and share its result.
+    stream_or_compute() does the same for computations that yield events:
+    joiners receive the leader's events as they are produced.
+    """
+
+    def __init__(self, maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._get(key)
+        return entry[1] if entry else None
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            entry = self._get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                self.misses += 1
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = compute()
+            self.set(key, flight.result)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.finish()
+
+    def stream_or_compute(self, key, produce, from_value):
+        """Generator form of get_or_compute.
+
+        produce() is a generator whose events are relayed to the caller and to
+        any concurrent caller for the same key; its return value is
+        (result, cacheable). Cached results, and results of a plain
+        get_or_compute() flight, are turned into events by from_value(result).
+        Raises FlightAbandoned in joiners when the leading caller stops early.
+        """
+        with self._lock:
+            entry = self._get(key)
+            if entry is not None:
+                self.hits += 1
+            else:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    self.misses += 1
+                    flight = self._flights[key] = _Flight()
+                else:
+                    self.coalesced += 1
+        if entry is not None:
+            yield from from_value(entry[1])
+            return
+
+        if not leader:
+            relayed = False
+            for event in flight.follow():
+                relayed = True
+                yield event
+            if flight.error is not None:
+                raise flight.error
+            if not relayed:
+                yield from from_value(flight.result)
+            return
+
+        finished = False
+        try:
+            events = produce()
+            while True:
+                try:
+                    event = next(events)
+                except StopIteration as stop:
+                    flight.result, cacheable = stop.value
+                    break
+                flight.publish(event)
+                yield event
+            if cacheable:
+                self.set(key, flight.result)
+            finished = True
+        except Exception as e:
+            flight.error = e
+            finished = True
+            raise
+        finally:
+            if not finished:
+                flight.error = FlightAbandoned(key)
+            with self._lock:
+                del self._flights[key]
+            flight.finish()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'in_flight': len(self._flights),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced
+            }
+
+
+search_cache = SearchCache()
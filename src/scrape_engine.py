@@ -0,0 +1,385 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from src.constants import (
+    FETCH_RETRIES, FETCH_WORKERS, HOST_ADAPTIVE_MAX_CONCURRENCY, HOST_MIN_INTERVAL, TARGET_DEADLINE
+)
+from src.metrics import (
+    SCRAPE_ERRORS, SCRAPE_FALLBACKS, SCRAPE_PAGES, SCRAPE_PHASE_SECONDS, SCRAPE_RETRIES, SCRAPE_THEATER_SECONDS,
+    record_span, registry, timed
+)
+from src.resilience import (
+    RETRYABLE_STATUS, CircuitOpenError, FetchFailed, HostHealth, backoff_delay, circuit_breaker, last_known_results,
+    retry_after_seconds
+)
+
+logger = logging.getLogger('MovieScraper')
+
+
+_fetch_executor = None
+_fetch_executor_lock = threading.Lock()
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+def fetch_executor():
+    # Blocking requests calls are I/O bound; the default executor is sized for CPUs
+    global _fetch_executor
+    with _fetch_executor_lock:
+        if _fetch_executor is None:
+            _fetch_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='fetch')
+        return _fetch_executor
+
+
+class HostPoliteness:
+    """Spaces out requests per host instead of sleeping globally between pages."""
+
+    def __init__(self, min_interval=1.0, max_concurrency=1):
+        self.min_interval = min_interval
+        self.max_concurrency = max_concurrency
+        self._semaphores = {}
+        self._locks = {}
+        self._last_request = {}
+
+    def _primitives(self, host):
+        # asyncio primitives are bound to the running loop, so create them lazily
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_concurrency)
+            self._locks[host] = asyncio.Lock()
+        return self._semaphores[host], self._locks[host]
+
+    @asynccontextmanager
+    async def slot(self, url, burst=1):
+        # Fixed budget: a prefetch burst gets no more than max_concurrency either
+        host = host_of(url)
+        semaphore, lock = self._primitives(host)
+        async with semaphore:
+            async with lock:
+                wait = self._last_request.get(host, 0) + self.min_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_request[host] = time.monotonic()
+            yield host
+
+    def record(self, url, response):
+        # Fixed budget: nothing to learn from responses
+        pass
+
+
+_host_health = {}
+_host_health_lock = threading.Lock()
+
+
+def host_health(host, min_interval, max_concurrency):
+    # One per host, shared across engines and fetch modes, so what one search learns applies to the next
+    with _host_health_lock:
+        health = _host_health.get(host)
+        if health is None:
+            health = _host_health[host] = HostHealth(min_interval, max_concurrency)
+        else:
+            # A caller with a different budget moves the bounds, not the learned state
+            health.min_interval = min_interval
+            health.max_concurrency = max_concurrency
+            health.interval = max(health.interval, min_interval)
+            health.limit = min(health.limit, max_concurrency)
+        return health
+
+
+class AdaptiveHostPoliteness(HostPoliteness):
+    """Per-host budget that adapts to how the site copes.
+
+    Starts at one request at a time min_interval apart, ramps up to
+    max_concurrency while responses are healthy and backs off on 429/5xx,
+    network errors and Retry-After (see resilience.HostHealth). A slot taken
+    with burst=n admits up to n requests in flight even before the limit has
+    ramped up; they are still spaced by the host's current interval.
+    """
+
+    def __init__(self, min_interval=1.0, max_concurrency=1):
+        super().__init__(min_interval, max_concurrency)
+        self._conditions = {}
+        self._active = {}
+
+    def health(self, host):
+        return host_health(host, self.min_interval, self.max_concurrency)
+
+    @asynccontextmanager
+    async def slot(self, url, burst=1):
+        host = host_of(url)
+        health = self.health(host)
+        if host not in self._conditions:
+            self._conditions[host] = asyncio.Condition()
+            self._locks[host] = asyncio.Lock()
+            self._active[host] = 0
+        condition = self._conditions[host]
+        async with condition:
+            # The limit can shrink while we wait, so re-check it on every wake-up
+            await condition.wait_for(lambda: self._active[host] < max(health.concurrency, burst))
+            self._active[host] += 1
+        try:
+            async with self._locks[host]:
+                now = time.monotonic()
+                ready = max(self._last_request.get(host, 0) + health.interval, health.not_before)
+                if ready > now:
+                    await asyncio.sleep(ready - now)
+                self._last_request[host] = time.monotonic()
+            yield host
+        finally:
+            async with condition:
+                self._active[host] -= 1
+                condition.notify_all()
+
+    def record(self, url, response):
+        health = self.health(host_of(url))
+        if response is None or response.status_code in RETRYABLE_STATUS:
+            health.on_overload(retry_after_seconds(response))
+        else:
+            health.on_success()
+
+
+@registry.collector
+def resilience_metrics():
+    with _host_health_lock:
+        healths = list(_host_health.items())
+    return [
+        ('showtime_host_concurrency_limit', 'gauge', 'Adaptive concurrent requests allowed per host',
+         [({'host': host}, health.concurrency) for host, health in healths]),
+        ('showtime_host_request_interval_seconds', 'gauge', 'Adaptive spacing between requests per host',
+         [({'host': host}, round(health.interval, 3)) for host, health in healths]),
+        ('showtime_circuit_open', 'gauge', 'Hosts short-circuited after repeated failures',
+         [({'host': host}, 1) for host in circuit_breaker.open_hosts()])
+    ]
+
+
+class AsyncScrapeEngine:
+    """Runs every theater target of a TheaterScraper concurrently.
+
+    By default pages of one target are walked in order (the next page is only
+    known after parsing the current one). With prefetch=True all pages of a
+    target are requested at once: up to max_pages of them in flight, spaced by
+    the host's request interval, and fetches past the last page are cancelled. Different theaters never wait on each other.
+    With a parse_pool (src/parse_pool.py) the parse/match stage runs in worker
+    processes instead of on the event loop thread.
+
+    Misbehaving sites are contained: 429/5xx and network errors are retried
+    with jittered backoff, every listing has a deadline, and hosts that keep
+    failing are short-circuited by a circuit breaker. A listing that fails or
+    is short-circuited is answered with its last-known results, if any.
+    """
+
+    def __init__(self, scraper, politeness=None, max_pages=5, prefetch=False, parse_pool=None,
+                 retries=FETCH_RETRIES, deadline=TARGET_DEADLINE, breaker=None, last_known=None):
+        self.scraper = scraper
+        self.politeness = politeness or AdaptiveHostPoliteness(HOST_MIN_INTERVAL, HOST_ADAPTIVE_MAX_CONCURRENCY)
+        self.max_pages = max_pages
+        self.prefetch = prefetch
+        self.parse_pool = parse_pool
+        self.retries = retries
+        self.deadline = deadline
+        self.breaker = breaker if breaker is not None else circuit_breaker
+        self.last_known = last_known if last_known is not None else last_known_results
+
+    async def fetch(self, url, burst=1):
+        async with self.politeness.slot(url, burst):
+            # requests is blocking; the context copy carries trace spans into the thread
+            context = contextvars.copy_context()
+            call = functools.partial(context.run, self.scraper.fetch, url)
+            return await asyncio.get_running_loop().run_in_executor(fetch_executor(), call)
+
+    async def fetch_timed(self, url, theater, burst=1):
+        start = time.perf_counter()
+        response = await self.fetch(url, burst)
+        total = time.perf_counter() - start
+        SCRAPE_PAGES.inc(theater=theater)
+        if getattr(response, 'from_cache', False):
+            SCRAPE_PHASE_SECONDS.observe(total, theater=theater, phase='cache')
+        else:
+            # requests' elapsed covers DNS, connect and server time up to the response headers
+            wait = min(response.elapsed.total_seconds(), total)
+            SCRAPE_PHASE_SECONDS.observe(wait, theater=theater, phase='wait')
+            SCRAPE_PHASE_SECONDS.observe(total - wait, theater=theater, phase='download')
+        record_span('fetch', start, total, theater=theater, url=url, status=response.status_code)
+        return response
+
+    async def fetch_page(self, full_url, theater, burst=1):
+        """Fetches one page, retrying 429/5xx and network errors with jittered backoff.
+
+        burst lets that many requests be in flight to the host (see AdaptiveHostPoliteness.slot).
+        """
+        host = host_of(full_url)
+        for attempt in range(self.retries + 1):
+            if self.breaker.cooling_down(host):
+                # Another page of this host tripped the breaker meanwhile; stop hammering it
+                raise CircuitOpenError(f"{host} is short-circuited after repeated failures")
+            try:
+                response = await self.fetch_timed(full_url, theater, burst)
+            except Exception as e:
+                SCRAPE_ERRORS.inc(theater=theater, kind=type(e).__name__)
+                self.politeness.record(full_url, None)
+                self.breaker.record_failure(host)
+                if attempt == self.retries:
+                    raise
+                delay = backoff_delay(attempt)
+            else:
+                self.politeness.record(full_url, response)
+                if response.status_code not in RETRYABLE_STATUS:
+                    self.breaker.record_success(host)
+                    return response
+                SCRAPE_ERRORS.inc(theater=theater, kind=f'http_{response.status_code}')
+                self.breaker.record_failure(host)
+                if attempt == self.retries:
+                    raise FetchFailed(full_url, response.status_code)
+                delay = backoff_delay(attempt, retry_after_seconds(response))
+            SCRAPE_RETRIES.inc(theater=theater)
+            logger.debug(f"Retrying {full_url} in {delay:.2f}s (attempt {attempt + 2})")
+            await asyncio.sleep(delay)
+
+    async def process_page(self, response, url, full_url, movie_name):
+        """Returns (matches, more); matches is None when the listing ended before this page."""
+        if response.status_code != 200:
+            SCRAPE_ERRORS.inc(theater=url, kind=f'http_{response.status_code}')
+            if response.status_code != 404:
+                logger.warning(f"Stopping {url} at {full_url}: HTTP {response.status_code}")
+            return None, False
+        if self.parse_pool is None:
+            return self.scraper.extract_matches(response.text, url, full_url, movie_name)
+        return await self.scraper.extract_matches_pooled(
+            self.parse_pool, response.content, response.encoding, url, full_url, movie_name
+        )
+
+    async def scrape_target(self, url, page_param, movie_name):
+        """Scrapes one listing within the deadline, unless its host is short-circuited."""
+        host = host_of(url)
+        if not self.breaker.allow(host):
+            raise CircuitOpenError(f"{host} is short-circuited after repeated failures")
+        try:
+            results = await asyncio.wait_for(self.scrape_listing(url, page_param, movie_name), self.deadline)
+        except asyncio.TimeoutError:
+            # Not a host failure: the listing may have spent its time queued behind others on the same host.
+            # Failed requests were already counted; only hand back a half-open trial nobody reported on.
+            self.breaker.release(host)
+            raise TimeoutError(f"{url} exceeded its {self.deadline}s deadline")
+        self.last_known.set(url, movie_name, results)
+        return results
+
+    def fallback(self, url, movie_name, error):
+        """Last-known results for a listing that just failed, or [] when there are none."""
+        stored = self.last_known.get(url, movie_name)
+        if stored is None:
+            return []
+        SCRAPE_FALLBACKS.inc(theater=url)
+        logger.warning(f"Serving last-known results for {url} ({error})")
+        return stored[0]
+
+    async def scrape_listing(self, url, page_param, movie_name):
+        if self.prefetch and '{}' in page_param:
+            return await self.scrape_target_prefetch(url, page_param, movie_name)
+        all_results = []
+        with timed(SCRAPE_THEATER_SECONDS, span='theater', theater=url):
+            for page in range(1, self.max_pages + 1):
+                full_url = f"{url}{page_param.format(page)}"
+                response = await self.fetch_page(full_url, url)
+                results, has_next = await self.process_page(response, url, full_url, movie_name)
+                if results is None:
+                    break
+                all_results.extend(results)
+                if not has_next:
+                    break
+        return all_results
+
+    async def scrape_target_prefetch(self, url, page_param, movie_name):
+        full_urls = [f"{url}{page_param.format(page)}" for page in range(1, self.max_pages + 1)]
+        tasks = [asyncio.create_task(self.fetch_page(full_url, url, len(full_urls))) for full_url in full_urls]
+        all_results = []
+        try:
+            with timed(SCRAPE_THEATER_SECONDS, span='theater', theater=url):
+                # Consume in page order so results keep the serial walk's ordering
+                for full_url, task in zip(full_urls, tasks):
+                    response = await task
+                    results, has_next = await self.process_page(response, url, full_url, movie_name)
+                    if results is None:
+                        break
+                    all_results.extend(results)
+                    if not has_next:
+                        break
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            # Reap cancelled and unneeded fetches so their errors are not reported as unhandled
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return all_results
+
+    def run_target(self, url, page_param, movie_name):
+        return asyncio.run(self.scrape_target(url, page_param, movie_name))
+
+    async def scrape_all(self, movie_name, targets=None):
+        targets = list(targets if targets is not None else self.scraper.targets())
+        outcomes = await asyncio.gather(
+            *(self.scrape_target(url, page_param, movie_name) for _, url, page_param in targets),
+            return_exceptions=True
+        )
+        all_showtimes = []
+        for (theater, url, _), outcome in zip(targets, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error while scraping theater {theater} ({url}): {outcome}")
+                outcome = self.fallback(url, movie_name, outcome)
+            all_showtimes.extend(outcome)
+        return all_showtimes
+
+    async def iter_targets(self, movie_name, targets=None):
+        """Yields one event per target as soon as that target is finished.
+
+        A failed target still reports its error, with last-known results (stale=True) when there are any.
+        """
+        targets = list(targets if targets is not None else self.scraper.targets())
+
+        async def scrape(theater, url, page_param):
+            try:
+                results = await self.scrape_target(url, page_param, movie_name)
+                return {'theater': theater, 'url': url, 'results': results, 'error': None, 'stale': False}
+            except Exception as e:
+                logger.error(f"Error while scraping theater {theater} ({url}): {e}")
+                results = self.fallback(url, movie_name, e)
+                return {'theater': theater, 'url': url, 'results': results, 'error': str(e), 'stale': bool(results)}
+
+        for finished in asyncio.as_completed([scrape(*target) for target in targets]):
+            yield await finished
+
+    def stream(self, movie_name, targets=None):
+        """Synchronous generator over iter_targets() for WSGI responses and Streamlit.
+
+        The event loop runs on a helper thread and hands events over a queue.
+        """
+        events = queue.Queue()
+        done = object()
+
+        async def produce():
+            async for event in self.iter_targets(movie_name, targets):
+                events.put(event)
+
+        def worker():
+            try:
+                asyncio.run(produce())
+            finally:
+                events.put(done)
+
+        threading.Thread(target=worker, daemon=True).start()
+        while True:
+            event = events.get()
+            if event is done:
+                return
+            yield event
+
+    def run(self, movie_name, targets=None):
+        return asyncio.run(self.scrape_all(movie_name, targets))
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+
+from src.crawler import search_showtimes
+from src.metrics import SEARCH_SECONDS, record_span, registry
+from src.models import pool_status, session_scope
+from src.movie_scraper import scrape_movie_info, stream_movie_info
+from src.result_cache import FlightAbandoned, normalize_query, search_cache
+
+logger = logging.getLogger('MovieScraper')
+
+# Watchlist titles with a background crawl in progress, by normalized query
+_watchlist_crawls = set()
+_watchlist_lock = threading.Lock()
+
+
+def search(movie_name):
+    """Crawled data first, live scrape when the tables know nothing about the movie."""
+    start = time.perf_counter()
+    with session_scope() as session:
+        found = search_showtimes(session, movie_name)
+    source = 'db'
+    if not found['results']:
+        found = {'results': scrape_movie_info(movie_name), 'freshness': None}
+        source = 'live'
+    duration = time.perf_counter() - start
+    SEARCH_SECONDS.observe(duration, source=source)
+    record_span('search', start, duration, source=source)
+    return found
+
+
+def cached_search(movie_name):
+    # Identical concurrent searches share one in-progress lookup
+    return search_cache.get_or_compute(normalize_query(movie_name), lambda: search(movie_name))
+
+
+def watchlist_search(titles):
+    """Answers a watchlist from the search cache and crawled data, never waiting on a live crawl.
+
+    Returns ({title: found}, pending titles). Titles neither knows are crawled
+    in the background, all of them with one shared crawl, and land in the
+    search cache; asking again once it is done returns their results.
+    """
+    found = {}
+    pending = []
+    with session_scope() as session:
+        for title in titles:
+            key = normalize_query(title)
+            result = search_cache.get(key)
+            if result is None:
+                result = search_showtimes(session, title)
+                if not result['results']:
+                    pending.append(title)
+                    continue
+                search_cache.set(key, result)
+            found[title] = result
+    if pending:
+        _start_watchlist_crawl(pending)
+    return found, pending
+
+
+def _start_watchlist_crawl(titles):
+    with _watchlist_lock:
+        keys = {normalize_query(title): title for title in titles}
+        new = {key: title for key, title in keys.items() if key not in _watchlist_crawls}
+        _watchlist_crawls.update(new)
+    if new:
+        threading.Thread(target=_crawl_watchlist, args=(new,), name='watchlist-crawl', daemon=True).start()
+
+
+def _crawl_watchlist(titles_by_key):
+    # Each listing is bounded by the engine's TARGET_DEADLINE, so a slow theater cannot pin the crawl
+    from src.watchlist import scrape_watchlist
+
+    try:
+        matches = scrape_watchlist(list(titles_by_key.values()))
+        for key, title in titles_by_key.items():
+            search_cache.set(key, {'results': matches.get(title, []), 'freshness': None})
+    except Exception as e:
+        logger.error(f"Watchlist crawl failed: {e}")
+    finally:
+        with _watchlist_lock:
+            _watchlist_crawls.difference_update(titles_by_key)
+
+
+def stream_search(movie_name):
+    """Yields {'theater', 'results', 'freshness', 'error'} events as results become available.
+
+    Cached and crawled results arrive as a single event; a live scrape yields one
+    event per theater page listing and fills the cache once every theater is done.
+    Concurrent identical searches share one lookup, streamed or not.
+    """
+    key = normalize_query(movie_name)
+    seen = set()
+    while True:
+        try:
+            for event in search_cache.stream_or_compute(key, lambda: _search_events(movie_name), _found_events):
+                # After a takeover, listings already sent by the abandoned flight are not repeated
+                if event['theater'] not in seen:
+                    seen.add(event['theater'])
+                    yield event
+            return
+        except FlightAbandoned:
+            # The client leading this search went away; take over or join whoever did
+            continue
+
+
+def _found_events(found):
+    yield {'theater': None, 'results': found['results'], 'freshness': found['freshness'], 'error': None}
+
+
+def _search_events(movie_name):
+    with session_scope() as session:
+        found = search_showtimes(session, movie_name)
+    if found['results']:
+        yield from _found_events(found)
+        return found, True
+
+    all_results = []
+    failed = False
+    for event in stream_movie_info(movie_name):
+        all_results.extend(event['results'])
+        failed = failed or event['error'] is not None
+        # Failed theaters may still carry last-known results; the error tells the client they are stale
+        yield {'theater': event['url'], 'results': event['results'], 'freshness': None, 'error': event['error']}
+    return {'results': all_results, 'freshness': None}, not failed
+
+
+@registry.collector
+def search_metrics():
+    stats = search_cache.stats()
+    pool = pool_status()
+    return [
+        ('showtime_search_cache_requests_total', 'counter', 'Search cache lookups by outcome',
+         [({'result': result}, stats[result]) for result in ('hits', 'misses', 'coalesced')]),
+        ('showtime_search_cache_entries', 'gauge', 'Cached search results', [({}, stats['entries'])]),
+        ('showtime_db_pool_connections', 'gauge', 'Database pool connections by state',
+         [({'state': state}, pool[state]) for state in ('checkedin', 'checkedout', 'overflow') if state in pool])
+    ]
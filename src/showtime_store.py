@@ -0,0 +1,208 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from src.constants import SHOWTIME_STORE_TTL
+from src.models import Movie, Showtime, Theater
+from src.persistence import local_today
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(moment):
+    # Showtimes are stored as naive local datetimes; keep them naive, just as integers
+    return int((moment - EPOCH).total_seconds())
+
+
+def from_epoch(seconds):
+    return EPOCH + timedelta(seconds=seconds)
+
+
+class ColumnIndex:
+    """Row positions of one theater or movie, ordered by start time, with their starts."""
+
+    __slots__ = ('rows', 'starts')
+
+    def __init__(self):
+        self.rows = array('i')
+        self.starts = array('q')
+
+
+class ShowtimeStore:
+    """Read-only columnar snapshot of the showtimes table.
+
+    Rows are kept as parallel typed arrays sorted by start time (epoch seconds),
+    theater and movie columns hold small dictionary codes instead of ids or
+    titles, and every theater and movie has its own time-sorted index. Time
+    ranges are found by bisection, so filters touch only the matching rows.
+    """
+
+    def __init__(self, rows=(), theaters=None, movies=None):
+        """rows: (theater_id, movie_id, start datetime); theaters: {id: (name, url)}; movies: {id: title}."""
+        theaters = theaters or {}
+        movies = movies or {}
+        self.theater_ids = array('i')
+        self.theater_names = []
+        self.theater_urls = []
+        self.movie_ids = array('i')
+        self.titles = []
+        theater_codes = {}
+        movie_codes = {}
+
+        self.starts = array('q')
+        self.theaters = array('H')
+        self.movies = array('i')
+        for theater_id, movie_id, start in sorted(rows, key=lambda row: row[2]):
+            if theater_id not in theater_codes:
+                theater_codes[theater_id] = len(self.theater_ids)
+                self.theater_ids.append(theater_id)
+                name, url = theaters.get(theater_id, ('', ''))
+                self.theater_names.append(name)
+                self.theater_urls.append(url)
+            if movie_id not in movie_codes:
+                movie_codes[movie_id] = len(self.movie_ids)
+                self.movie_ids.append(movie_id)
+                self.titles.append(movies.get(movie_id, ''))
+            self.starts.append(to_epoch(start))
+            self.theaters.append(theater_codes[theater_id])
+            self.movies.append(movie_codes[movie_id])
+
+        self.by_theater = [ColumnIndex() for _ in self.theater_ids]
+        self.by_movie = [ColumnIndex() for _ in self.movie_ids]
+        for position, start in enumerate(self.starts):
+            for index in (self.by_theater[self.theaters[position]], self.by_movie[self.movies[position]]):
+                index.rows.append(position)
+                index.starts.append(start)
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def load(cls, session, since=None):
+        """Loads every showtime starting at or after `since` (default: all of them)."""
+        query = session.query(Showtime.theater_id, Showtime.movie_id, Showtime.showtime)
+        if since is not None:
+            query = query.filter(Showtime.showtime >= since)
+        rows = query.all()
+        theaters = {row.id: (row.name, row.url) for row in session.query(Theater.id, Theater.name, Theater.url)}
+        movie_ids = {row[1] for row in rows}
+        movies = {}
+        ordered = sorted(movie_ids)
+        for offset in range(0, len(ordered), 1000):
+            batch = ordered[offset:offset + 1000]
+            movies.update(session.query(Movie.id, Movie.title).filter(Movie.id.in_(batch)).all())
+        return cls(rows, theaters, movies)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def nbytes(self):
+        """Approximate size of the columns and indexes (titles and names excluded)."""
+        columns = [self.starts, self.theaters, self.movies, self.theater_ids, self.movie_ids]
+        for index in self.by_theater + self.by_movie:
+            columns.extend((index.rows, index.starts))
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def theater_codes(self, text):
+        """Codes of theaters whose name or URL contains text (case-insensitive)."""
+        text = text.lower()
+        return [
+            code for code, (name, url) in enumerate(zip(self.theater_names, self.theater_urls))
+            if text in name.lower() or text in url.lower()
+        ]
+
+    def movie_codes(self, movie_ids):
+        wanted = set(movie_ids)
+        return [code for code, movie_id in enumerate(self.movie_ids) if movie_id in wanted]
+
+    def _positions(self, start, end, theater_codes, movie_codes):
+        # Walk whichever index is narrower; the other filter is a set lookup per row
+        lower = to_epoch(start) if start is not None else None
+        upper = to_epoch(end) if end is not None else None
+        if theater_codes is not None and (movie_codes is None or len(theater_codes) <= len(movie_codes)):
+            indexes = [self.by_theater[code] for code in theater_codes]
+            check, wanted = self.movies, set(movie_codes) if movie_codes is not None else None
+        elif movie_codes is not None:
+            indexes = [self.by_movie[code] for code in movie_codes]
+            check, wanted = self.theaters, set(theater_codes) if theater_codes is not None else None
+        else:
+            indexes = [self]
+            check, wanted = None, None
+
+        positions = []
+        for index in indexes:
+            starts = index.starts
+            low = bisect_left(starts, lower) if lower is not None else 0
+            high = bisect_left(starts, upper) if upper is not None else len(starts)
+            rows = index.rows[low:high] if index is not self else range(low, high)
+            if wanted is not None:
+                rows = [row for row in rows if check[row] in wanted]
+            positions.extend(rows)
+        if len(indexes) > 1:
+            positions.sort()
+        return positions
+
+    def query(self, start=None, end=None, theater=None, movie_ids=None, limit=None):
+        """Showtimes with start <= showtime < end, optionally for theaters matching
+        `theater` (name or URL substring) and/or the given movie ids, in time order.
+
+        Returns dicts with theater, theater_url, movie_id, title and showtime.
+        """
+        theater_codes = self.theater_codes(theater) if theater else None
+        movie_codes = self.movie_codes(movie_ids) if movie_ids is not None else None
+        positions = self._positions(start, end, theater_codes, movie_codes)
+        if limit is not None:
+            positions = positions[:limit]
+        results = []
+        for position in positions:
+            theater_code = self.theaters[position]
+            movie_code = self.movies[position]
+            results.append({
+                'theater': self.theater_names[theater_code],
+                'theater_url': self.theater_urls[theater_code],
+                'movie_id': self.movie_ids[movie_code],
+                'title': self.titles[movie_code],
+                'showtime': from_epoch(self.starts[position])
+            })
+        return results
+
+    def count(self, start=None, end=None, theater=None, movie_ids=None):
+        theater_codes = self.theater_codes(theater) if theater else None
+        movie_codes = self.movie_codes(movie_ids) if movie_ids is not None else None
+        return len(self._positions(start, end, theater_codes, movie_codes))
+
+
+class SharedShowtimeStore:
+    """Process-wide store, rebuilt from the database once it is older than `ttl` seconds.
+
+    The rebuild runs in the caller that first notices the expiry; concurrent
+    callers are served the old store meanwhile instead of queueing behind it.
+    """
+
+    def __init__(self, ttl=SHOWTIME_STORE_TTL):
+        self.ttl = ttl
+        self._store = None
+        self._lock = threading.Lock()
+
+    def get(self, session):
+        store = self._store
+        if store is not None and time.monotonic() - store.loaded_at < self.ttl:
+            return store
+        # Only the first load makes callers wait; an expired store is rebuilt by one caller
+        # while everyone else keeps reading the previous snapshot
+        if not self._lock.acquire(blocking=store is None):
+            return store
+        try:
+            if self._store is None or time.monotonic() - self._store.loaded_at >= self.ttl:
+                # Past showtimes are history; only today onwards is worth keeping in memory
+                self._store = ShowtimeStore.load(session, since=local_today())
+            return self._store
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        with self._lock:
+            self._store = None
+
+
+showtime_store = SharedShowtimeStore()
@@ -0,0 +1,227 @@
+import argparse
+import gzip
+import itertools
+import json
+import logging
+import os
+import sys
+from contextlib import nullcontext
+from datetime import datetime
+
+from src.constants import PARSE_WORKERS
+from src.crawler import normalize_title, parse_showtimes
+from src.logging_config import setup_logging
+from src.movie_scraper import TheaterScraper
+from src.parse_pool import ParsePool
+from src.scrape_engine import AsyncScrapeEngine
+
+logger = logging.getLogger('MovieScraper')
+
+BATCH_SIZE = 1000
+
+
+def iter_records(scraper=None, max_pages=5, prefetch=False, parse_pool=None, stream=False):
+    """Crawls every configured theater and yields normalized records as each theater finishes.
+
+    Records are flat dicts (theater, theater_url, title, showtime, times, link,
+    crawled_at): one per showtime, or one with showtime=None when the listing
+    has no parseable time. With stream=True pages are parsed while they
+    download and records are yielded per movie (see src/streaming.py).
+    """
+    scraper = scraper or TheaterScraper()
+    names = {url: theater for theater, url, _ in scraper.targets()}
+    if stream:
+        from src.streaming import stream_results
+
+        for result in stream_results(scraper, None, max_pages):
+            yield from _records(result, names.get(result['theater'], result['theater']))
+        return
+    engine = AsyncScrapeEngine(scraper, max_pages=max_pages, prefetch=prefetch, parse_pool=parse_pool)
+    for event in engine.stream(None):
+        if event['error']:
+            logger.error(f"Snapshot skips {event['url']}: {event['error']}")
+            continue
+        crawled_at = datetime.utcnow().replace(microsecond=0)
+        for result in event['results']:
+            yield from _records(result, names.get(event['url'], event['theater']), crawled_at)
+
+
+def _records(result, theater, crawled_at=None):
+    base = {
+        'theater': theater,
+        'theater_url': result['theater'],
+        'title': normalize_title(result['title']),
+        'times': result['times'],
+        'link': result['link'],
+        'crawled_at': crawled_at or datetime.utcnow().replace(microsecond=0)
+    }
+    starts = parse_showtimes(result['times'])
+    for start in starts or [None]:
+        yield dict(base, showtime=start)
+
+
+def _open_text(path, mode, compressed=None):
+    if path == '-':
+        return nullcontext(sys.stdout if 'w' in mode else sys.stdin)
+    if compressed if compressed is not None else path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _temporary_path(path):
+    # Write next to the target and rename at the end, so readers never see a partial snapshot
+    return path if path == '-' else f"{path}.{os.getpid()}.tmp"
+
+
+def _discard(target, path):
+    if target != path and os.path.exists(target):
+        os.remove(target)
+
+
+def write_jsonl(records, path):
+    """Streams records to JSON lines (gzip for *.gz, stdout for '-'); returns the count."""
+    target = _temporary_path(path)
+    count = 0
+    try:
+        with _open_text(target, 'w', compressed=path.endswith('.gz')) as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=datetime.isoformat))
+                f.write('\n')
+                count += 1
+    except BaseException:
+        _discard(target, path)
+        raise
+    if target != path:
+        os.replace(target, path)
+    return count
+
+
+def write_parquet(records, path, batch_size=BATCH_SIZE):
+    """Streams records to Parquet, one row group per batch; returns the count."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('theater', pa.string()), ('theater_url', pa.string()), ('title', pa.string()),
+        ('showtime', pa.timestamp('s')), ('times', pa.string()), ('link', pa.string()),
+        ('crawled_at', pa.timestamp('s'))
+    ])
+    target = _temporary_path(path)
+    count = 0
+    records = iter(records)
+    try:
+        with pq.ParquetWriter(target, schema, compression='zstd') as writer:
+            while True:
+                batch = list(itertools.islice(records, batch_size))
+                if not batch:
+                    break
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+    except BaseException:
+        _discard(target, path)
+        raise
+    os.replace(target, path)
+    return count
+
+
+def write_snapshot(records, path):
+    if path.endswith('.parquet'):
+        return write_parquet(records, path)
+    return write_jsonl(records, path)
+
+
+def read_snapshot(path, batch_size=BATCH_SIZE):
+    """Yields records from a JSONL(.gz) or Parquet snapshot without loading it whole."""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield from batch.to_pylist()
+        return
+    with _open_text(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            for key in ('showtime', 'crawled_at'):
+                if record.get(key):
+                    record[key] = datetime.fromisoformat(record[key])
+            yield record
+
+
+def load_snapshot(session, records, batch_size=BATCH_SIZE):
+    """Bulk-loads snapshot records into the showtime tables, batch by batch; returns rows written."""
+    from src.persistence import bulk_upsert_showtimes, upsert_movies, upsert_theaters
+
+    written = 0
+    # Undated listings are only useful to readers of the snapshot itself
+    dated = (record for record in records if record['showtime'] is not None)
+    while True:
+        batch = list(itertools.islice(dated, batch_size))
+        if not batch:
+            return written
+        crawled_at = max(record['crawled_at'] for record in batch)
+        theater_ids = upsert_theaters(session, {record['theater_url']: record['theater'] for record in batch},
+                                      crawled_at)
+        movie_ids = upsert_movies(session, [record['title'] for record in batch])
+        written += bulk_upsert_showtimes(session, [
+            (theater_ids[record['theater_url']], movie_ids[record['title']], record['showtime'], record['link'])
+            for record in batch
+        ])
+        session.commit()
+
+
+def store_from_snapshot(path):
+    """Builds an in-memory ShowtimeStore straight from a snapshot, no database involved."""
+    from src.showtime_store import ShowtimeStore
+
+    theaters = {}
+    movies = {}
+    rows = []
+    for record in read_snapshot(path):
+        if record['showtime'] is None:
+            continue
+        theater_id = theaters.setdefault((record['theater'], record['theater_url']), len(theaters) + 1)
+        movie_id = movies.setdefault(record['title'], len(movies) + 1)
+        rows.append((theater_id, movie_id, record['showtime']))
+    return ShowtimeStore(
+        rows,
+        {theater_id: theater for theater, theater_id in theaters.items()},
+        {movie_id: title for title, movie_id in movies.items()}
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl every theater into a snapshot file, or load one into the database")
+    parser.add_argument('--output', type=str, default='-',
+                        help='Snapshot path: *.jsonl, *.jsonl.gz or *.parquet ("-" writes JSON lines to stdout)')
+    parser.add_argument('--load', type=str, default=None, help='Bulk-load this snapshot into the database instead of crawling')
+    parser.add_argument('--max_pages', type=int, default=5, help='Pages per theater listing')
+    parser.add_argument('--prefetch', action='store_true', help='Fetch all pages of a listing concurrently')
+    parser.add_argument('--parse_workers', type=int, default=PARSE_WORKERS, help='Parse in N worker processes (0: in-process)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Parse pages while they download, with bounded memory (ignores --prefetch/--parse_workers)')
+    parser.add_argument('--json_logs', action='store_true', help='Write logs as JSON lines')
+    args = parser.parse_args()
+
+    setup_logging(json_format=args.json_logs)
+    if args.load:
+        from src.models import Session, init_db
+
+        init_db()
+        try:
+            written = load_snapshot(Session(), read_snapshot(args.load))
+        finally:
+            Session.remove()
+        logger.info(f"Loaded {written} showtimes from {args.load}")
+        return
+
+    with ParsePool(args.parse_workers) if args.parse_workers > 0 and not args.stream else nullcontext() as parse_pool:
+        records = iter_records(max_pages=args.max_pages, prefetch=args.prefetch, parse_pool=parse_pool,
+                               stream=args.stream)
+        count = write_snapshot(records, args.output)
+    logger.info(f"Wrote {count} records to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
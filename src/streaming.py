@@ -0,0 +1,145 @@
+import logging
+import queue
+import threading
+import time
+
+from src.constants import HOST_MIN_INTERVAL, STREAM_CHUNK_SIZE, STREAM_QUEUE_SIZE
+from src.html_parsers import IncrementalListingParser
+from src.metrics import SCRAPE_ERRORS, SCRAPE_PAGES, SCRAPE_RESULTS
+from src.resilience import RETRYABLE_STATUS, circuit_breaker
+from src.scrape_engine import host_of
+from src.title_index import title_matches
+
+logger = logging.getLogger('MovieScraper')
+
+_DONE = object()
+
+
+def iter_page(response, url, full_url, movie_name, chunk_size=STREAM_CHUNK_SIZE):
+    """Parses a streamed listing page chunk by chunk, yielding result dicts as movies complete.
+
+    The generator's return value is (movies_seen, has_next). Only one chunk and
+    the movies not yet handed out are held, never the whole page or a tree.
+    """
+    parser = IncrementalListingParser(response.encoding)
+    seen = 0
+    for chunk in response.iter_content(chunk_size):
+        movies = parser.feed(chunk)
+        seen += len(movies)
+        yield from _results(movies, url, full_url, movie_name)
+    movies, has_next = parser.close()
+    seen += len(movies)
+    yield from _results(movies, url, full_url, movie_name)
+    return seen, has_next
+
+
+def _results(movies, url, full_url, movie_name):
+    count = 0
+    for title, times in movies:
+        if movie_name is None or title_matches(movie_name, title):
+            count += 1
+            yield {'theater': url, 'title': title, 'times': times or 'Check website for times', 'link': full_url}
+    if count:
+        SCRAPE_RESULTS.inc(count, theater=url)
+
+
+def iter_listing(scraper, url, page_param, movie_name, max_pages=5, interval=HOST_MIN_INTERVAL):
+    """Walks a paginated listing with streaming fetches, yielding results as they are parsed.
+
+    A page that fails part way ends the listing; results already yielded stand,
+    so there is no retry here (use the scrape engine for that).
+    """
+    host = host_of(url)
+    reported = False
+    try:
+        for page in range(1, max_pages + 1):
+            full_url = f"{url}{page_param.format(page)}"
+            with scraper.http.stream(full_url) as response:
+                SCRAPE_PAGES.inc(theater=url)
+                if response.status_code in RETRYABLE_STATUS:
+                    circuit_breaker.record_failure(host)
+                else:
+                    # Any deliberate answer, 404 included, shows the host is up
+                    circuit_breaker.record_success(host)
+                reported = True
+                if response.status_code != 200:
+                    SCRAPE_ERRORS.inc(theater=url, kind=f'http_{response.status_code}')
+                    if response.status_code != 404:
+                        logger.warning(f"Stopping {url} at {full_url}: HTTP {response.status_code}")
+                    return
+                seen, has_next = yield from iter_page(response, url, full_url, movie_name)
+            if not seen or not has_next:
+                return
+            time.sleep(interval)  # Be nice to servers
+    except GeneratorExit:
+        raise
+    except Exception:
+        circuit_breaker.record_failure(host)
+        reported = True
+        raise
+    finally:
+        if not reported:
+            # Closed before the host answered: hand a half-open trial back instead of holding it
+            circuit_breaker.release(host)
+
+
+def stream_results(scraper, movie_name, max_pages=5, targets=None, queue_size=STREAM_QUEUE_SIZE):
+    """Yields result dicts from every listing as soon as they are parsed, in arrival order.
+
+    One thread per host walks that host's listings one after another. The
+    bounded queue applies back-pressure: crawl threads wait while the consumer
+    is busy, so memory stays flat however large the pages are. Closing the
+    generator early stops the threads after their current chunk.
+    """
+    targets = list(targets if targets is not None else scraper.targets())
+    by_host = {}
+    for theater, url, page_param in targets:
+        by_host.setdefault(host_of(url), []).append((theater, url, page_param))
+    results = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def crawl(host, host_targets):
+        try:
+            for theater, url, page_param in host_targets:
+                if not circuit_breaker.allow(host):
+                    logger.error(f"Skipping {theater} ({url}): {host} is short-circuited after repeated failures")
+                    continue
+                listing = iter_listing(scraper, url, page_param, movie_name, max_pages)
+                try:
+                    for result in listing:
+                        if not put(result):
+                            return
+                except Exception as e:
+                    SCRAPE_ERRORS.inc(theater=url, kind=type(e).__name__)
+                    logger.error(f"Error while streaming theater {theater} ({url}): {e}")
+                finally:
+                    # Settles the listing's breaker report now rather than at garbage collection
+                    listing.close()
+        finally:
+            put(_DONE)
+
+    threads = [
+        threading.Thread(target=crawl, args=(host, host_targets), name=f"stream-{host}", daemon=True)
+        for host, host_targets in by_host.items()
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        running = len(threads)
+        while running:
+            item = results.get()
+            if item is _DONE:
+                running -= 1
+                continue
+            yield item
+    finally:
+        stop.set()
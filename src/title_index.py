@@ -0,0 +1,128 @@
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+# Tokens that carry no meaning for matching (articles, screening and language tags)
+STOPWORDS = {
+    'the', 'a', 'an', 'der', 'die', 'das', 'part', 'teil', 'chapter',
+    'omu', 'omeu', 'ov', 'omdu', '3d', 'imax', 'dolby', 'atmos',
+    'hindi', 'tamil', 'telugu', 'malayalam', 'kannada'
+}
+NUMERALS = {'ii': '2', 'iii': '3', 'iv': '4', 'one': '1', 'two': '2', 'three': '3', 'four': '4'}
+# Spelling variants common when Indian titles are transliterated to Latin script
+TRANSLITERATIONS = [
+    ('aa', 'a'), ('ee', 'i'), ('oo', 'u'), ('ou', 'u'),
+    ('bh', 'b'), ('dh', 'd'), ('gh', 'g'), ('jh', 'j'), ('kh', 'k'), ('ph', 'p'), ('th', 't'),
+    ('sh', 's'), ('w', 'v'), ('z', 'j'), ('y', 'i')
+]
+# Score floors for the query phrase found in the title as whole words, or as the start of a word
+PHRASE_SCORE = 0.9
+PREFIX_SCORE = 0.8
+MIN_PREFIX_LENGTH = 3
+NON_WORD = re.compile(r'[^\w]+')
+REPEATS = re.compile(r'(.)\1+')
+
+
+def fold_token(token):
+    token = NUMERALS.get(token, token)
+    for variant, canonical in TRANSLITERATIONS:
+        token = token.replace(variant, canonical)
+    return REPEATS.sub(r'\1', token)
+
+
+def normalize(title):
+    """Lower-cased, accent-free, transliteration-folded tokens of a title."""
+    text = unicodedata.normalize('NFKD', title)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    tokens = [t for t in NON_WORD.sub(' ', text).split() if t not in STOPWORDS]
+    return [fold_token(t) for t in tokens]
+
+
+def trigrams(tokens):
+    grams = set()
+    for token in tokens:
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def score(query_tokens, query_grams, title_tokens, shared_grams, title_gram_count):
+    dice = 2 * shared_grams / (len(query_grams) + title_gram_count) if query_grams else 0.0
+    title_set = set(title_tokens)
+    overlap = sum(1 for t in query_tokens if t in title_set) / len(query_tokens) if query_tokens else 0.0
+    result = 0.6 * overlap + 0.4 * dice
+    phrase = ' '.join(query_tokens)
+    text = f" {' '.join(title_tokens)} "
+    if query_tokens and f" {phrase} " in text:
+        result = max(result, PHRASE_SCORE)
+    elif len(phrase) >= MIN_PREFIX_LENGTH and f" {phrase}" in text:
+        # Typed-ahead queries: 'Push' finds 'Pushpa 2', ranked below whole-word matches
+        result = max(result, PREFIX_SCORE)
+    return result
+
+
+def title_matches(query, title, min_score=0.5):
+    """One-off fuzzy comparison for code paths without an index."""
+    query_tokens, title_tokens = normalize(query), normalize(title)
+    query_grams, title_grams = trigrams(query_tokens), trigrams(title_tokens)
+    return score(query_tokens, query_grams, title_tokens, len(query_grams & title_grams), len(title_grams)) >= min_score
+
+
+class TitleIndex:
+    """Token and trigram inverted index over movie titles with ranked fuzzy lookup.
+
+    Titles can be added at any time; only the new title's postings are touched.
+    """
+
+    def __init__(self, titles=()):
+        self._titles = []
+        self._payloads = []
+        self._tokens = []
+        self._gram_counts = []
+        self._by_key = {}
+        self._postings = defaultdict(list)
+        self._lock = threading.Lock()
+        self.update(titles)
+
+    def __len__(self):
+        return len(self._titles)
+
+    def add(self, title, payload=None):
+        tokens = normalize(title)
+        key = (title, payload)
+        with self._lock:
+            if key in self._by_key:
+                return self._by_key[key]
+            doc_id = len(self._titles)
+            grams = trigrams(tokens)
+            self._titles.append(title)
+            self._payloads.append(payload)
+            self._tokens.append(tokens)
+            self._gram_counts.append(len(grams))
+            self._by_key[key] = doc_id
+            for gram in grams:
+                self._postings[gram].append(doc_id)
+            return doc_id
+
+    def update(self, titles):
+        for item in titles:
+            if isinstance(item, tuple):
+                self.add(*item)
+            else:
+                self.add(item)
+
+    def search(self, query, limit=10, min_score=0.5):
+        """Returns [(title, payload, score)] best first."""
+        query_tokens = normalize(query)
+        query_grams = trigrams(query_tokens)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._postings.get(gram, ()))
+        ranked = []
+        for doc_id, count in shared.items():
+            value = score(query_tokens, query_grams, self._tokens[doc_id], count, self._gram_counts[doc_id])
+            if value >= min_score:
+                ranked.append((value, doc_id))
+        ranked.sort(key=lambda item: (-item[0], self._titles[item[1]]))
+        return [(self._titles[d], self._payloads[d], round(v, 3)) for v, d in ranked[:limit]]
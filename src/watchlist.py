@@ -0,0 +1,150 @@
+import argparse
+import json
+import sys
+from collections import deque
+from contextlib import nullcontext
+
+from src.movie_scraper import TheaterScraper
+from src.parse_pool import ParsePool
+from src.scrape_engine import AsyncScrapeEngine
+from src.title_index import MIN_PREFIX_LENGTH, PREFIX_SCORE, normalize, score, trigrams
+
+
+class AhoCorasick:
+    """Multi-pattern substring automaton: one pass over a text finds every pattern in it."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(pattern_id)
+
+        # Breadth-first failure links (depth-1 states fail to the root); outputs are inherited
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0) if state else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        """Returns the set of pattern ids occurring in text."""
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            if self.output[state]:
+                found.update(self.output[state])
+        return found
+
+
+class WatchlistMatcher:
+    """Matches one listing title against every watchlist title at once.
+
+    Watchlist phrases (after title_index normalization) that start a word of the
+    title, whole or typed-ahead, are found with a single Aho-Corasick pass; titles
+    sharing a token with a watchlist entry are additionally scored with the same
+    fuzzy score as the title index. For any min_score above 0.4 this matches
+    exactly what title_matches() would: a title with neither scores at most 0.4.
+    """
+
+    def __init__(self, titles, min_score=0.5):
+        self.titles = list(titles)
+        self.min_score = min_score
+        self._tokens = [normalize(title) for title in self.titles]
+        self._grams = [trigrams(tokens) for tokens in self._tokens]
+        self._automaton = AhoCorasick([phrase_pattern(tokens) for tokens in self._tokens])
+        self._by_token = {}
+        for watch_id, tokens in enumerate(self._tokens):
+            for token in tokens:
+                self._by_token.setdefault(token, set()).add(watch_id)
+
+    def match(self, title):
+        title_tokens = normalize(title)
+        if not title_tokens:
+            return set()
+        found = self._automaton.find(f" {' '.join(title_tokens)} ")
+        # Every hit is at least a prefix match, so it clears any threshold up to PREFIX_SCORE unscored
+        matched = found if self.min_score <= PREFIX_SCORE else set()
+        candidates = set(found)
+        for token in title_tokens:
+            candidates.update(self._by_token.get(token, ()))
+        title_grams = trigrams(title_tokens)
+        for watch_id in candidates - matched:
+            query_grams = self._grams[watch_id]
+            value = score(self._tokens[watch_id], query_grams, title_tokens,
+                          len(query_grams & title_grams), len(title_grams))
+            if value >= self.min_score:
+                matched.add(watch_id)
+        return matched
+
+
+def phrase_pattern(tokens):
+    # Same rule as title_index.score: long enough phrases also match as the start of a word
+    phrase = ' '.join(tokens)
+    return f" {phrase}" if len(phrase) >= MIN_PREFIX_LENGTH else f" {phrase} "
+
+
+def match_watchlist(titles, records, min_score=0.5):
+    """Groups crawl records (with 'title') under every watchlist title they match."""
+    matcher = WatchlistMatcher(titles, min_score)
+    matches = {title: [] for title in matcher.titles}
+    for record in records:
+        for watch_id in matcher.match(record['title']):
+            matches[matcher.titles[watch_id]].append(record)
+    return matches
+
+
+def scrape_watchlist(titles, scraper=None, max_pages=5, prefetch=False, parse_pool=None):
+    """Crawls every theater page once and returns {title: [results]} for all titles."""
+    scraper = scraper or TheaterScraper()
+    records = AsyncScrapeEngine(scraper, max_pages=max_pages, prefetch=prefetch, parse_pool=parse_pool).run(None)
+    return match_watchlist(titles, records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search showtimes for a whole watchlist with a single crawl")
+    parser.add_argument('titles', nargs='*', help='Movie titles to look for')
+    parser.add_argument('--file', type=str, default=None, help='File with one title per line ("-" for stdin)')
+    parser.add_argument('--max_pages', type=int, default=5, help='Pages per theater listing')
+    parser.add_argument('--prefetch', action='store_true', help='Fetch all pages of a listing concurrently')
+    parser.add_argument('--parse_workers', type=int, default=0, help='Parse in N worker processes (0: in-process)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    titles = list(args.titles)
+    if args.file:
+        handle = sys.stdin if args.file == '-' else open(args.file, encoding='utf-8')
+        with handle:
+            titles.extend(line.strip() for line in handle if line.strip() and not line.startswith('#'))
+    if not titles:
+        parser.error('no titles given')
+
+    with ParsePool(args.parse_workers) if args.parse_workers > 0 else nullcontext() as parse_pool:
+        results = scrape_watchlist(titles, max_pages=args.max_pages, prefetch=args.prefetch, parse_pool=parse_pool)
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+    for title, shows in results.items():
+        print(f"{title}: {len(shows)} listing(s)")
+        for show in shows:
+            print(f"  {show['theater']}  {show['title']}  {show['times']}  {show['link']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+from datetime import datetime
+
+from src.constants import (
+    DEFAULT_REFRESH_INTERVAL, HOST_MIN_INTERVAL, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS, QUEUE_WORKERS,
+    THEATER_REFRESH_INTERVALS, WORK_QUEUE_PATH
+)
+from src.resilience import RETRYABLE_STATUS, backoff_delay
+from src.scrape_engine import host_of
+
+logger = logging.getLogger('MovieScraper')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    host TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+-- At most one live task per key: enqueueing a page that is already queued or running is a no-op
+CREATE UNIQUE INDEX IF NOT EXISTS ux_tasks_live_key ON tasks(key) WHERE status IN ('pending', 'leased');
+CREATE INDEX IF NOT EXISTS ix_tasks_ready ON tasks(status, available_at);
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY,
+    next_at REAL NOT NULL
+);
+"""
+
+
+class Task:
+    def __init__(self, id, key, payload, attempts, lease_owner):
+        self.id = id
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+        self.lease_owner = lease_owner
+
+    def __repr__(self):
+        return f"Task({self.id}, {self.key!r}, attempt {self.attempts})"
+
+
+class WorkQueue:
+    """Durable task queue in a local SQLite file, safe to share between processes.
+
+    Tasks are leased rather than popped: a worker that dies without completing
+    its task loses the lease after `lease_seconds` and the task is handed out
+    again. Failed tasks are retried with jittered backoff up to max_attempts.
+    Leasing also spaces out requests per host across all workers.
+    """
+
+    def __init__(self, path=WORK_QUEUE_PATH, lease_seconds=QUEUE_LEASE_SECONDS, max_attempts=QUEUE_MAX_ATTEMPTS,
+                 host_interval=HOST_MIN_INTERVAL):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.host_interval = host_interval
+        # Autocommit mode; multi-statement changes use explicit BEGIN IMMEDIATE
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def enqueue(self, key, payload, host, delay=0.0):
+        """Adds a task unless one with the same key is already pending or leased; returns True if added."""
+        now = time.time()
+        cursor = self.connection.execute(
+            'INSERT OR IGNORE INTO tasks (key, host, payload, max_attempts, available_at, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (key, host, json.dumps(payload), self.max_attempts, now + delay, now, now)
+        )
+        return cursor.rowcount == 1
+
+    def lease(self, owner):
+        """Claims the next ready task whose host is not rate limited, or returns None."""
+        now = time.time()
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            # Expired leases of tasks that used up their attempts are not coming back
+            self.connection.execute(
+                "UPDATE tasks SET status = 'failed', last_error = 'lease expired', updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = self.connection.execute(
+                "SELECT t.id, t.key, t.host, t.payload, t.attempts FROM tasks t "
+                "LEFT JOIN hosts h ON h.host = t.host "
+                "WHERE ((t.status = 'pending' AND t.available_at <= ?) OR (t.status = 'leased' AND t.lease_expires < ?)) "
+                "AND (h.next_at IS NULL OR h.next_at <= ?) "
+                "ORDER BY t.available_at, t.id LIMIT 1",
+                (now, now, now)
+            ).fetchone()
+            if row is None:
+                self.connection.execute('COMMIT')
+                return None
+            self.connection.execute(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (owner, now + self.lease_seconds, now, row['id'])
+            )
+            self.connection.execute(
+                'INSERT INTO hosts (host, next_at) VALUES (?, ?) '
+                'ON CONFLICT(host) DO UPDATE SET next_at = excluded.next_at',
+                (row['host'], now + self.host_interval)
+            )
+            self.connection.execute('COMMIT')
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        return Task(row['id'], row['key'], json.loads(row['payload']), row['attempts'] + 1, owner)
+
+    def extend(self, task):
+        """Renews the lease of a long-running task; False if the lease was lost."""
+        now = time.time()
+        cursor = self.connection.execute(
+            "UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (now + self.lease_seconds, now, task.id, task.lease_owner)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, task):
+        now = time.time()
+        cursor = self.connection.execute(
+            "UPDATE tasks SET status = 'done', lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (now, task.id, task.lease_owner)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, task, error):
+        """Schedules a retry with backoff, or marks the task failed once it is out of attempts."""
+        now = time.time()
+        cursor = self.connection.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+            "available_at = ?, lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (now + backoff_delay(task.attempts, cap=self.lease_seconds), str(error)[:500], now, task.id,
+             task.lease_owner)
+        )
+        return cursor.rowcount == 1
+
+    def stats(self):
+        rows = self.connection.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def purge(self, older_than):
+        """Deletes finished tasks last updated more than older_than seconds ago."""
+        cursor = self.connection.execute(
+            "DELETE FROM tasks WHERE status IN ('done', 'failed') AND updated_at < ?", (time.time() - older_than,)
+        )
+        return cursor.rowcount
+
+
+def page_task(theater, url, page_param, page, max_pages):
+    full_url = f"{url}{page_param.format(page)}"
+    payload = {'theater': theater, 'url': url, 'page_param': page_param, 'page': page, 'max_pages': max_pages}
+    return full_url, payload
+
+
+def enqueue_theaters(queue, scraper, theaters=None, max_pages=5):
+    """Enqueues page 1 of every listing of the given theaters (all by default); returns how many were new."""
+    added = 0
+    for theater, url, page_param in scraper.targets():
+        if theaters is not None and theater not in theaters:
+            continue
+        full_url, payload = page_task(theater, url, page_param, 1, max_pages)
+        added += queue.enqueue(full_url, payload, host_of(full_url))
+    return added
+
+
+class PageWorker:
+    """Crawls one (theater, page) task and writes the page's showtimes through the models.
+
+    Pages whose content fingerprint is unchanged are only touched. When a page
+    ends the listing, later pages remembered from earlier crawls are treated as
+    vanished; otherwise the next page is enqueued for any worker to pick up.
+    """
+
+    def __init__(self, queue, scraper=None, session_factory=None):
+        from src.models import Session
+        from src.movie_scraper import TheaterScraper
+
+        self.queue = queue
+        self.scraper = scraper or TheaterScraper()
+        self.session_factory = session_factory or Session
+
+    def process(self, task):
+        from src.crawler import normalize_title, parse_showtimes
+        from src.incremental import apply_page_diffs, page_fingerprint
+        from src.models import PageFingerprint
+        from src.persistence import upsert_movies, upsert_theaters
+
+        payload = task.payload
+        url, page, max_pages = payload['url'], payload['page'], payload['max_pages']
+        full_url = task.key
+        response = self.scraper.fetch(full_url)
+        if response.status_code in RETRYABLE_STATUS:
+            raise RuntimeError(f"HTTP {response.status_code} from {full_url}")
+        if response.status_code not in (200, 404):
+            # Blocked or refused (403, 410, ...): nothing is known about the listing, so leave its data alone
+            logger.warning(f"Skipping {full_url}: HTTP {response.status_code}")
+            return False
+
+        session = self.session_factory()
+        try:
+            theater_ids = upsert_theaters(session, {url: payload['theater']})
+            changed, unchanged = {}, []
+            if response.status_code == 404:
+                # The listing ended before this page
+                has_next, first_gone = False, page
+            else:
+                html = response.text
+                fingerprint = page_fingerprint(html)
+                known = session.query(PageFingerprint.fingerprint, PageFingerprint.has_next).filter(
+                    PageFingerprint.url == full_url
+                ).first()
+                first_gone = page + 1
+                if known is not None and known.fingerprint == fingerprint:
+                    has_next = known.has_next
+                    unchanged.append(full_url)
+                else:
+                    results, has_next = self.scraper.extract_matches(html, url, full_url, None)
+                    records = results or []
+                    movie_ids = upsert_movies(session, [normalize_title(record['title']) for record in records])
+                    showtimes = {
+                        (theater_ids[url], movie_ids[normalize_title(record['title'])], start)
+                        for record in records for start in parse_showtimes(record['times'])
+                    }
+                    changed[full_url] = {'target': url, 'fingerprint': fingerprint, 'has_next': has_next,
+                                         'showtimes': showtimes}
+            vanished = []
+            if not has_next:
+                vanished = [f"{url}{payload['page_param'].format(n)}" for n in range(first_gone, max_pages + 1)]
+            apply_page_diffs(session, changed, vanished, theater_ids, unchanged)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        if has_next and page < max_pages:
+            next_url, next_payload = page_task(payload['theater'], url, payload['page_param'], page + 1, max_pages)
+            self.queue.enqueue(next_url, next_payload, host_of(next_url))
+        return has_next
+
+    def run(self, owner, exit_when_empty=False, idle_sleep=1.0):
+        processed = 0
+        while True:
+            task = self.queue.lease(owner)
+            if task is None:
+                stats = self.queue.stats()
+                if exit_when_empty and stats['pending'] == 0 and stats['leased'] == 0:
+                    return processed
+                time.sleep(idle_sleep)
+                continue
+            try:
+                self.process(task)
+            except Exception as e:
+                logger.warning(f"{owner}: {task} failed: {e}")
+                self.queue.fail(task, e)
+            else:
+                self.queue.complete(task)
+            processed += 1
+
+
+def worker_main(queue_path, index, exit_when_empty, json_logs):
+    # Each process opens its own queue connection and database engine
+    from src.logging_config import setup_logging
+    from src.models import init_db
+
+    setup_logging(json_format=json_logs)
+    init_db()
+    owner = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    queue = WorkQueue(queue_path)
+    try:
+        processed = PageWorker(queue).run(owner, exit_when_empty=exit_when_empty)
+        logger.info(f"{owner} finished after {processed} tasks")
+    finally:
+        queue.close()
+
+
+def start_workers(queue_path, workers, exit_when_empty=False, json_logs=False):
+    context = multiprocessing.get_context('spawn')
+    processes = [
+        context.Process(target=worker_main, args=(queue_path, index, exit_when_empty, json_logs), daemon=False)
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def coordinate(queue, scraper, max_pages=5, poll_interval=30, once=False):
+    """Enqueues each theater's listings whenever its refresh interval has passed."""
+    last_enqueued = {}
+    theaters = sorted({theater for theater, _, _ in scraper.targets()})
+    while True:
+        now = time.time()
+        due = [
+            theater for theater in theaters
+            if now - last_enqueued.get(theater, 0) >= THEATER_REFRESH_INTERVALS.get(theater, DEFAULT_REFRESH_INTERVAL)
+        ]
+        if due:
+            added = enqueue_theaters(queue, scraper, set(due), max_pages)
+            for theater in due:
+                last_enqueued[theater] = now
+            logger.info(f"Enqueued {added} listings for {', '.join(due)} ({queue.stats()})")
+        if once:
+            return
+        queue.purge(older_than=24 * 60 * 60)
+        time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue-driven crawl: a coordinator enqueues pages, workers crawl them")
+    parser.add_argument('mode', choices=['coordinator', 'worker', 'crawl'],
+                        help='coordinator: enqueue on schedule; worker: consume the queue; crawl: enqueue once and drain')
+    parser.add_argument('--queue', type=str, default=WORK_QUEUE_PATH, help='SQLite file holding the queue')
+    parser.add_argument('--workers', type=int, default=QUEUE_WORKERS, help='Worker processes to start')
+    parser.add_argument('--max_pages', type=int, default=5, help='Pages per theater listing')
+    parser.add_argument('--poll_interval', type=int, default=30, help='Seconds between coordinator checks')
+    parser.add_argument('--json_logs', action='store_true', help='Write logs as JSON lines')
+    args = parser.parse_args()
+
+    from src.logging_config import setup_logging
+    from src.models import init_db
+    from src.movie_scraper import TheaterScraper
+
+    setup_logging(json_format=args.json_logs)
+    init_db()
+    queue = WorkQueue(args.queue)
+    if args.mode == 'coordinator':
+        coordinate(queue, TheaterScraper(), args.max_pages, args.poll_interval)
+        return
+
+    if args.mode == 'crawl':
+        coordinate(queue, TheaterScraper(), args.max_pages, once=True)
+    started = datetime.utcnow()
+    processes = start_workers(args.queue, args.workers, exit_when_empty=args.mode == 'crawl', json_logs=args.json_logs)
+    for process in processes:
+        process.join()
+    logger.info(f"Workers done in {(datetime.utcnow() - started).total_seconds():.1f}s: {queue.stats()}")
+    queue.close()
+
+
+if __name__ == '__main__':
+    main()
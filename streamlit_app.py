@@ -0,0 +1,40 @@
+import streamlit as st
+
+from src.logging_config import setup_logging
+from src.models import init_db
+from src.search import stream_search
+
+
+def main():
+    setup_logging()
+    st.title("Stuttgart Movie Showtimes Finder")
+    st.write("Search for movie showtimes in Stuttgart theaters (specialized in Indian movies)")
+
+    movie_name = st.text_input("Enter movie name:", "")
+
+    if st.button("Search Showtimes"):
+        if movie_name:
+            init_db()
+            status = st.empty()
+            status.info('Searching for showtimes...')
+            found = 0
+            # Render each theater's results as soon as it has been scraped
+            for event in stream_search(movie_name):
+                if event['freshness']:
+                    st.caption(f"Data as of {event['freshness']:%d.%m.%Y %H:%M} UTC")
+                for show in event['results']:
+                    st.subheader(show['theater'])
+                    st.write(f"Showtimes: {show.get('times', 'Check website for times')}")
+                    st.markdown(f"[More Info]({show['link']})")
+                found += len(event['results'])
+                if found:
+                    status.info(f"Searching for showtimes... {found} found so far")
+
+            if found:
+                status.success("Found showtimes!")
+            else:
+                status.warning(f"No showtimes found for '{movie_name}'. Try another movie name or check back later.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import threading
+import time
+from contextlib import nullcontext
+
+import pytest
+from flask import Flask
+
+from src import api as api_module
+from src import search as search_module
+from src import watchlist as watchlist_module
+from src.api import api, encode_cursor
+from src.result_cache import SearchCache
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api_module, 'cached_search', lambda movie: {
+        'results': [{'title': f'{movie} {n}'} for n in range(5)], 'freshness': None
+    })
+    app = Flask(__name__)
+    app.register_blueprint(api)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('cursor', [
+    'MQ', 'W10', 'bnVsbA', 'not base64!', encode_cursor({'offset': '2'}), encode_cursor({'offset': -1}),
+    encode_cursor({'offset': True}), encode_cursor({'offset': 1.5})
+])
+def test_search_rejects_invalid_cursors(client, cursor):
+    response = client.get('/api/search', query_string={'movie': 'Leo', 'cursor': cursor})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
+
+
+def test_search_pages_with_cursor(client):
+    first = client.get('/api/search', query_string={'movie': 'Leo', 'limit': 3}).get_json()
+    assert [r['title'] for r in first['results']] == ['Leo 0', 'Leo 1', 'Leo 2']
+    second = client.get('/api/search', query_string={'movie': 'Leo', 'limit': 3, 'cursor': first['next_cursor']})
+    assert [r['title'] for r in second.get_json()['results']] == ['Leo 3', 'Leo 4']
+    assert second.get_json()['next_cursor'] is None
+
+
+def test_watchlist_answers_without_waiting_for_a_live_crawl(client, monkeypatch):
+    cache = SearchCache()
+    crawled, release = [], threading.Event()
+
+    def scrape_watchlist(titles):
+        crawled.append(titles)
+        release.wait(5)
+        return {title: [{'title': f'{title} (Telugu)'}] for title in titles}
+
+    monkeypatch.setattr(search_module, 'search_cache', cache)
+    monkeypatch.setattr(search_module, 'session_scope', nullcontext)
+    monkeypatch.setattr(search_module, 'search_showtimes', lambda session, title: {
+        'results': [{'title': title}] if title == 'Leo' else [], 'freshness': None
+    })
+    monkeypatch.setattr(watchlist_module, 'scrape_watchlist', scrape_watchlist)
+
+    response = client.post('/api/watchlist', json={'titles': ['Leo', 'Pushpa 2']})
+    assert response.status_code == 202
+    assert response.get_json() == {'results': {'Leo': [{'title': 'Leo'}], 'Pushpa 2': []}, 'pending': ['Pushpa 2']}
+    # Asking again while the crawl runs does not start another one
+    assert client.post('/api/watchlist', json={'titles': ['Pushpa 2']}).status_code == 202
+
+    release.set()
+    for _ in range(100):
+        if cache.get('puspa 2') is not None:
+            break
+        time.sleep(0.01)
+    response = client.post('/api/watchlist', json={'titles': ['Leo', 'Pushpa 2']})
+    assert response.status_code == 200
+    assert response.get_json()['results']['Pushpa 2'] == [{'title': 'Pushpa 2 (Telugu)'}]
+    assert crawled == [['Pushpa 2']]
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect
+
+import app as app_module
+from src import models
+from src.showtime_store import showtime_store
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_importing_the_app_does_not_touch_the_database(tmp_path):
+    database = tmp_path / 'showtimes.db'
+    subprocess.run(
+        [sys.executable, '-c', 'import app; assert app.app.name == "app"'],
+        cwd=ROOT, check=True, env=dict(os.environ, DATABASE_URL=f'sqlite:///{database}')
+    )
+    assert not database.exists()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    previous = models._engine
+    engine = models._create_engine(f"sqlite:///{tmp_path / 'showtimes.db'}")
+    monkeypatch.setattr(models, '_engine', engine)
+    models.Session.configure(bind=engine)
+    monkeypatch.setattr(app_module, '_database_ready', False)
+    yield app_module.app.test_client()
+    models.Session.remove()
+    models.Session.configure(bind=previous)
+    showtime_store.invalidate()
+
+
+def test_first_request_prepares_the_database(client, monkeypatch):
+    calls = []
+    init_db = app_module.init_db
+    monkeypatch.setattr(app_module, 'init_db', lambda: calls.append('init_db') or init_db())
+    assert client.get('/api/schedule').status_code == 200
+    assert client.get('/api/schedule').status_code == 200
+    assert calls == ['init_db']
+    assert inspect(models._engine).has_table('showtimes')
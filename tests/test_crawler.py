@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from src.crawler import parse_showtimes
+from src.persistence import local_now, local_today
+
+TODAY = datetime(2025, 3, 10, 15, 42)
+
+
+def test_times_without_date_are_today():
+    assert parse_showtimes('17:30 20:45', TODAY) == [datetime(2025, 3, 10, 17, 30), datetime(2025, 3, 10, 20, 45)]
+
+
+def test_each_time_belongs_to_preceding_date():
+    assert parse_showtimes('Fr 14.03. 17:30 Sa 15.03. 20:00 21:15', TODAY) == [
+        datetime(2025, 3, 14, 17, 30), datetime(2025, 3, 15, 20, 0), datetime(2025, 3, 15, 21, 15)
+    ]
+
+
+def test_times_before_first_date_use_it():
+    assert parse_showtimes('17:30 ab 14.03.', TODAY) == [datetime(2025, 3, 14, 17, 30)]
+
+
+def test_invalid_date_is_skipped():
+    assert parse_showtimes('31.02. 17:30 01.03.2025 20:00', TODAY) == [datetime(2025, 3, 1, 20, 0)]
+
+
+def test_year_rolls_forward_for_dates_far_in_the_past():
+    december = datetime(2024, 12, 20)
+    assert parse_showtimes('Mo 13.01. 18:00', december) == [datetime(2025, 1, 13, 18, 0)]
+    # A recent past date stays in this year
+    assert parse_showtimes('Mo 02.12. 18:00', december) == [datetime(2024, 12, 2, 18, 0)]
+
+
+def test_explicit_year_is_kept():
+    assert parse_showtimes('13.01.2024 18:00', TODAY) == [datetime(2024, 1, 13, 18, 0)]
+
+
+def test_today_follows_the_theaters_clock_not_utc():
+    berlin = datetime.now(ZoneInfo('Europe/Berlin')).replace(tzinfo=None)
+    assert abs(local_now() - berlin) < timedelta(seconds=5)
+    assert local_today() == local_now().replace(hour=0, minute=0, second=0, microsecond=0)
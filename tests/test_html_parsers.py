@@ -0,0 +1,31 @@
+import pytest
+
+from src.html_parsers import available_parsers
+
+PARSERS = available_parsers()
+
+PAGE = (
+    '<html><body><div class="movie-title">Jawan</div><div class="movie-title">Leo</div>'
+    '<div class="showtime">Fr 14.03. 17:30</div><div class="movie-title">RRR</div>'
+    '<a class="next" href="?page=2">next</a></body></html>'
+)
+
+
+@pytest.mark.parametrize('name', sorted(PARSERS))
+def test_backends_agree(name):
+    page = PARSERS[name].parse(PAGE)
+    assert page.movies == [('Jawan', 'Fr 14.03. 17:30'), ('Leo', 'Fr 14.03. 17:30'), ('RRR', None)]
+    assert page.has_next
+
+
+@pytest.mark.parametrize('name', sorted(PARSERS))
+@pytest.mark.parametrize('html', ['', '   \n'])
+def test_empty_body_is_an_empty_listing(name, html):
+    page = PARSERS[name].parse(html)
+    assert page.movies == [] and not page.has_next
+
+
+@pytest.mark.parametrize('name', sorted(PARSERS))
+def test_xml_declaration_is_accepted(name):
+    page = PARSERS[name].parse('<?xml version="1.0" encoding="utf-8"?>\n' + PAGE)
+    assert len(page.movies) == 3
@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from src import http_client
+from src.http_client import DiskCache, HttpClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(http_client, 'time', fake)
+    return fake
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.encoding = 'utf-8'
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers)
+        return self.responses.pop(0)
+
+
+def client_with(cache, *responses):
+    client = HttpClient(cache=cache)
+    client.session = FakeSession(*responses)
+    return client
+
+
+def test_fresh_entries_are_served_until_the_ttl_expires(tmp_path, clock):
+    client = client_with(DiskCache(str(tmp_path), ttl=60),
+                         FakeResponse(200, b'v1', {'ETag': '"1"'}), FakeResponse(200, b'v2', {'ETag': '"2"'}))
+    assert client.get('https://a').content == b'v1'
+    clock.now += 59
+    cached = client.get('https://a')
+    assert (cached.content, cached.from_cache) == (b'v1', True)
+    assert len(client.session.requests) == 1
+    clock.now += 1
+    assert client.get('https://a').content == b'v2'
+    assert client.session.requests[1] == {'If-None-Match': '"1"'}
+
+
+def test_304_revalidates_the_cached_body_and_restarts_the_ttl(tmp_path, clock):
+    client = client_with(DiskCache(str(tmp_path), ttl=60),
+                         FakeResponse(200, b'body', {'ETag': '"1"', 'Last-Modified': 'Fri, 14 Mar 2025 10:00:00 GMT'}),
+                         FakeResponse(304))
+    client.get('https://a')
+    clock.now += 61
+    revalidated = client.get('https://a')
+    assert (revalidated.content, revalidated.from_cache) == (b'body', True)
+    assert client.session.requests[1] == {'If-None-Match': '"1"', 'If-Modified-Since': 'Fri, 14 Mar 2025 10:00:00 GMT'}
+    clock.now += 59
+    assert client.get('https://a').content == b'body'
+    assert len(client.session.requests) == 2
+
+
+def test_least_recently_used_bodies_are_evicted(tmp_path, clock):
+    cache = DiskCache(str(tmp_path), max_bytes=25)
+    for age, url in enumerate(['https://b', 'https://a']):
+        cache.set(url, FakeResponse(200, b'x' * 10))
+        os.utime(cache._paths(url)[1], (100 + age, 100 + age))
+    # Reading a makes b the least recently used
+    assert cache.get('https://a')
+    cache.set('https://c', FakeResponse(200, b'x' * 10))
+    assert cache.get('https://b') is None
+    assert cache.get('https://a') and cache.get('https://c')
+    assert cache._total == 20
+
+
+def test_writes_track_the_size_without_listing_the_directory(tmp_path, clock, monkeypatch):
+    cache = DiskCache(str(tmp_path), max_bytes=1000)
+    listings = []
+    listdir = os.listdir
+    monkeypatch.setattr(http_client.os, 'listdir', lambda path: listings.append(path) or listdir(path))
+    for n in range(5):
+        cache.set(f'https://{n}', FakeResponse(200, b'x' * 10))
+    cache.set('https://0', FakeResponse(200, b'x' * 30))
+    assert len(listings) == 1
+    assert cache._total == 70
+
+
+def test_a_body_removed_after_reading_is_still_returned(tmp_path, clock, monkeypatch):
+    cache = DiskCache(str(tmp_path))
+    cache.set('https://a', FakeResponse(200, b'body'))
+
+    def removed(path, times):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(http_client.os, 'utime', removed)
+    assert cache.get('https://a')['body'] == b'body'
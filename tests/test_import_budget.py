@@ -0,0 +1,17 @@
+import os
+
+import pytest
+
+from benchmarks.import_budget import BUDGETS, check
+
+# Slower CI machines can loosen every budget, e.g. IMPORT_BUDGET_SCALE=2
+SCALE = float(os.environ.get('IMPORT_BUDGET_SCALE', '1.0'))
+
+
+@pytest.mark.parametrize('module', sorted(BUDGETS))
+def test_import_budget(module):
+    report, = check([module], repeat=3, scale=SCALE)
+    assert not report['forbidden_loaded'], f"{module} imports {', '.join(report['forbidden_loaded'])}"
+    assert report['import_ms'] <= report['budget_ms'], (
+        f"{module} took {report['import_ms']} ms to import (budget {report['budget_ms']} ms)"
+    )
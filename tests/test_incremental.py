@@ -0,0 +1,99 @@
+import asyncio
+
+from src.html_parsers import get_parser
+from src.incremental import IncrementalScraper, page_fingerprint
+from src.movie_scraper import TheaterScraper
+from src.parse_pool import parse_in_worker
+
+LISTING = (
+    '<div class="movie-title">Jawan</div><div class="showtime">Fr 14.03. 17:30</div>'
+    '<div class="movie-title">Leo</div><div class="showtime">Fr 14.03. 20:00</div>'
+    '<a class="next" href="?page=2">next</a>'
+)
+
+
+def page(listing, extra=''):
+    return f'<html><body><div class="teaser">{extra}</div>{listing}<script>var t = "{extra}";</script></body></html>'
+
+
+def test_changes_outside_the_listing_keep_the_fingerprint():
+    assert page_fingerprint(page(LISTING, 'Heute: 14.03.')) == page_fingerprint(page(LISTING, 'Morgen <img src="a.jpg?v=2">'))
+
+
+def test_whitespace_in_listing_nodes_is_normalized():
+    assert page_fingerprint(page(LISTING)) == page_fingerprint(page(LISTING.replace('Jawan', '  Jawan\n')))
+
+
+def test_listing_changes_change_the_fingerprint():
+    original = page_fingerprint(page(LISTING))
+    assert page_fingerprint(page(LISTING.replace('20:00', '20:15'))) != original
+    assert page_fingerprint(page(LISTING.replace('Leo', 'Leo (Tamil)'))) != original
+    assert page_fingerprint(page(LISTING.replace('class="next"', 'class="prev"'))) != original
+
+
+def test_bytes_and_text_agree():
+    assert page_fingerprint(page(LISTING).encode('utf-8')) == page_fingerprint(page(LISTING))
+
+
+class CountingParser:
+    def __init__(self):
+        self.parser = get_parser()
+        self.name = self.parser.name
+        self.calls = 0
+
+    def parse(self, html):
+        self.calls += 1
+        return self.parser.parse(html)
+
+
+def test_unchanged_pages_are_never_parsed():
+    url = 'https://cinema.example/programm'
+    full_url = f'{url}?page=1'
+    scraper = TheaterScraper(http=object())
+    scraper.parser = CountingParser()
+    first = IncrementalScraper(scraper, {})
+    results, has_next = first.extract_matches(page(LISTING), url, full_url, None)
+    assert [result['title'] for result in results] == ['Jawan', 'Leo'] and has_next
+    assert scraper.parser.calls == 1
+
+    known = {full_url: (first.changed[full_url]['fingerprint'], True)}
+    again = IncrementalScraper(scraper, known)
+    assert again.extract_matches(page(LISTING, 'Neu!'), url, full_url, None) == ([], True)
+    assert scraper.parser.calls == 1
+    assert again.unchanged == {full_url} and not again.changed
+
+
+class InlinePool:
+    # Stands in for ParsePool without worker processes
+    def __init__(self):
+        self.calls = 0
+
+    async def parse(self, parser_name, raw, encoding, movie_name):
+        self.calls += 1
+        return parse_in_worker(parser_name, raw, encoding, movie_name)
+
+
+def test_pooled_extraction_only_sends_changed_pages_to_the_pool():
+    url = 'https://cinema.example/programm'
+    full_url = f'{url}?page=1'
+    raw = page(LISTING).encode('utf-8')
+    scraper = TheaterScraper(http=object())
+    scraper.parser = CountingParser()
+    pool = InlinePool()
+    first = IncrementalScraper(scraper, {})
+    results, has_next = asyncio.run(first.extract_matches_pooled(pool, raw, 'utf-8', url, full_url, 'leo'))
+    assert [result['title'] for result in results] == ['Leo'] and has_next
+    assert pool.calls == 1 and scraper.parser.calls == 0
+
+    again = IncrementalScraper(scraper, {full_url: (first.changed[full_url]['fingerprint'], True)})
+    assert asyncio.run(again.extract_matches_pooled(pool, raw, 'utf-8', url, full_url, 'leo')) == ([], True)
+    assert pool.calls == 1 and scraper.parser.calls == 0
+
+
+def test_a_failed_listing_only_protects_its_own_pages():
+    short, long = 'https://www.cinemaxx.de/stuttgart', 'https://www.cinemaxx.de/stuttgart-si-centrum'
+    scraper = IncrementalScraper(None, {f'{short}?page=2': ('a', False), f'{long}?page=2': ('b', False)})
+    scraper.failed.add(f'{long}?page=1')
+    assert scraper.vanished_pages([short, long]) == [f'{short}?page=2']
+    scraper.failed = {f'{short}?page=1'}
+    assert scraper.vanished_pages([short, long]) == [f'{long}?page=2']
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from src.models import Base, Movie, session_scope, upgrade_schema
+
+BASELINE = [
+    "CREATE TABLE theaters (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, url VARCHAR NOT NULL, created_at DATETIME)",
+    "CREATE TABLE movies (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, language VARCHAR, created_at DATETIME)",
+    "CREATE TABLE showtimes (id INTEGER PRIMARY KEY, theater_id INTEGER, movie_id INTEGER, "
+    "showtime DATETIME NOT NULL, created_at DATETIME)",
+]
+
+
+def test_upgrade_adds_columns_and_merges_duplicates():
+    engine = create_engine('sqlite://')
+    with engine.begin() as connection:
+        for statement in BASELINE:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO theaters (id, name, url) VALUES (1, 'A', 'http://a'), (2, 'A', 'http://a')"))
+        connection.execute(text("INSERT INTO movies (id, title) VALUES (1, 'Leo'), (2, 'Leo')"))
+        connection.execute(text(
+            "INSERT INTO showtimes (theater_id, movie_id, showtime) VALUES "
+            "(1, 1, '2025-03-14 17:30:00'), (2, 2, '2025-03-14 17:30:00'), (2, 1, '2025-03-14 20:00:00')"
+        ))
+
+    assert upgrade_schema(engine)
+    Base.metadata.create_all(engine)
+
+    inspector = inspect(engine)
+    assert 'last_crawled_at' in {column['name'] for column in inspector.get_columns('theaters')}
+    assert 'page_url' in {column['name'] for column in inspector.get_columns('showtimes')}
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT theater_id, movie_id FROM showtimes ORDER BY showtime")).all() == [
+            (1, 1), (1, 1)
+        ]
+        assert connection.execute(text("SELECT COUNT(*) FROM movies")).scalar() == 1
+    assert upgrade_schema(engine) == []
+
+
+def test_current_schema_needs_no_upgrade():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    assert upgrade_schema(engine) == []
+
+
+def test_session_scope_commits_or_rolls_back_sessions_of_a_given_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'showtimes.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with session_scope(factory) as session:
+        session.add(Movie(title='Leo'))
+    with pytest.raises(RuntimeError):
+        with session_scope(factory) as session:
+            session.add(Movie(title='Jawan'))
+            session.flush()
+            raise RuntimeError('crawl failed')
+    with session_scope(factory) as session:
+        assert [movie.title for movie in session.query(Movie)] == ['Leo']
@@ -0,0 +1,96 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session as OrmSession
+
+from src import models
+from src.incremental import apply_page_diffs
+from src.models import Base, Movie, Showtime, ShowtimeSummary, Theater, init_db
+from src.persistence import bulk_upsert_showtimes
+
+DAY = datetime(2025, 3, 14)
+PAGE = 'https://cinema.example/programm?page=1'
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'showtimes.db'}")
+    Base.metadata.create_all(engine)
+    with OrmSession(engine) as session:
+        session.add_all([Theater(id=1, name='A', url='https://a'), Theater(id=2, name='B', url='https://b'),
+                         Movie(id=1, title='Leo'), Movie(id=2, title='Jawan')])
+        session.commit()
+    return engine
+
+
+def summaries(session):
+    return sorted(
+        (row.theater_id, row.movie_id, row.day, row.showtimes, row.first_showtime, row.times)
+        for row in session.query(ShowtimeSummary)
+    )
+
+
+def grouped(session):
+    """The summaries recomputed from scratch with a GROUP BY over the showtimes table."""
+    day = func.date(Showtime.showtime)
+    rows = session.execute(
+        select(Showtime.theater_id, Showtime.movie_id, day, func.count(), func.min(Showtime.showtime))
+        .group_by(Showtime.theater_id, Showtime.movie_id, day)
+    ).all()
+    expected = []
+    for theater_id, movie_id, day_text, count, first in rows:
+        starts = sorted(session.execute(
+            select(Showtime.showtime).where(Showtime.theater_id == theater_id, Showtime.movie_id == movie_id,
+                                            func.date(Showtime.showtime) == day_text)
+        ).scalars())
+        expected.append((theater_id, movie_id, date.fromisoformat(day_text), count, first,
+                         ', '.join(f"{start:%H:%M}" for start in starts)))
+    return sorted(expected)
+
+
+def at(days, hour, minute=0):
+    return DAY + timedelta(days=days, hours=hour, minutes=minute)
+
+
+def test_upserts_keep_summaries_in_step(engine):
+    with OrmSession(engine) as session:
+        bulk_upsert_showtimes(session, [(1, 1, at(0, 20)), (1, 1, at(0, 17, 30)), (2, 1, at(1, 18))])
+        bulk_upsert_showtimes(session, [(1, 1, at(0, 17, 30)), (1, 1, at(0, 22)), (1, 2, at(0, 20))])
+        session.commit()
+        assert summaries(session) == grouped(session)
+        assert len(summaries(session)) == 3
+
+
+def test_stale_deletes_keep_summaries_in_step(engine):
+    with OrmSession(engine) as session:
+        page = {'target': 'https://a', 'fingerprint': 'x', 'has_next': False,
+                'showtimes': {(1, 1, at(0, 17)), (1, 1, at(0, 20)), (1, 2, at(1, 18))}}
+        apply_page_diffs(session, {PAGE: page}, [], {'https://a': 1}, [], now=DAY)
+        session.commit()
+        assert summaries(session) == grouped(session)
+
+        # 20:00 and Jawan's only day are gone, 21:00 is new
+        page = dict(page, fingerprint='y', showtimes={(1, 1, at(0, 17)), (1, 1, at(0, 21))})
+        assert apply_page_diffs(session, {PAGE: page}, [], {'https://a': 1}, [], now=DAY) == (1, 2)
+        session.commit()
+        assert summaries(session) == grouped(session)
+        assert [row[:2] for row in summaries(session)] == [(1, 1)]
+
+        # A vanished page takes its summaries with it
+        apply_page_diffs(session, {}, [PAGE], {'https://a': 1}, [], now=DAY)
+        session.commit()
+        assert summaries(session) == grouped(session) == []
+
+
+def test_init_db_backfills_summaries_of_an_older_database(engine, monkeypatch):
+    ShowtimeSummary.__table__.drop(engine)
+    with OrmSession(engine) as session:
+        session.add_all([Showtime(theater_id=1, movie_id=1, showtime=at(0, hour)) for hour in (14, 17, 20)]
+                        + [Showtime(theater_id=2, movie_id=2, showtime=at(2, 19))])
+        session.commit()
+    monkeypatch.setattr(models, '_engine', engine)
+    init_db()
+    with OrmSession(engine) as session:
+        assert summaries(session) == grouped(session)
+        assert len(summaries(session)) == 2
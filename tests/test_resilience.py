@@ -0,0 +1,131 @@
+import pytest
+
+from src import resilience
+from src.resilience import CircuitBreaker, HostHealth
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience, 'time', fake)
+    return fake
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failures=3, cooldown=10)
+    for _ in range(2):
+        breaker.record_failure('a')
+    assert breaker.allow('a') and not breaker.is_open('a')
+    breaker.record_failure('a')
+    assert breaker.is_open('a') and breaker.cooling_down('a')
+    assert not breaker.allow('a')
+    assert breaker.open_hosts() == ['a']
+    assert breaker.allow('b')
+
+
+def test_breaker_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failures=2, cooldown=10)
+    breaker.record_failure('a')
+    breaker.record_success('a')
+    breaker.record_failure('a')
+    assert not breaker.is_open('a')
+
+
+def test_breaker_half_open_trial_success_closes(clock):
+    breaker = CircuitBreaker(failures=1, cooldown=10)
+    breaker.record_failure('a')
+    clock.now += 10
+    assert not breaker.cooling_down('a')
+    assert breaker.allow('a')
+    # Only one trial at a time
+    assert not breaker.allow('a')
+    breaker.record_success('a')
+    assert not breaker.is_open('a') and breaker.allow('a')
+
+
+def test_breaker_failed_trial_restarts_cooldown(clock):
+    breaker = CircuitBreaker(failures=1, cooldown=10)
+    breaker.record_failure('a')
+    clock.now += 10
+    assert breaker.allow('a')
+    breaker.record_failure('a')
+    assert breaker.cooling_down('a') and not breaker.allow('a')
+    clock.now += 10
+    assert breaker.allow('a')
+
+
+def test_breaker_unreported_trial_expires(clock):
+    breaker = CircuitBreaker(failures=1, cooldown=10)
+    breaker.record_failure('a')
+    clock.now += 10
+    assert breaker.allow('a')
+    clock.now += 9
+    assert not breaker.allow('a')
+    clock.now += 1
+    assert breaker.allow('a')
+
+
+def test_host_health_additive_increase(clock):
+    health = HostHealth(min_interval=0.5, max_concurrency=4)
+    assert health.concurrency == 1
+    for _ in range(20):
+        health.on_success()
+    assert health.concurrency == 4
+    assert health.interval == 0.5
+
+
+def test_host_health_multiplicative_decrease_once_per_interval(clock):
+    health = HostHealth(min_interval=0.5, max_concurrency=8, max_interval=4.0)
+    health.limit = 8.0
+    health.on_overload()
+    assert health.limit == 4.0 and health.interval == 1.0
+    # A burst of failures from requests already in flight counts once
+    health.on_overload()
+    assert health.limit == 4.0 and health.interval == 1.0
+    clock.now += 1.0
+    health.on_overload()
+    assert health.limit == 2.0 and health.interval == 2.0
+    for _ in range(3):
+        clock.now += 5
+        health.on_overload()
+    assert health.limit == 1.0 and health.interval == 4.0
+
+
+def test_host_health_success_halves_interval_to_floor(clock):
+    health = HostHealth(min_interval=0.5, max_concurrency=2, max_interval=4.0)
+    health.interval = 4.0
+    health.on_success()
+    assert health.interval == 2.0
+    for _ in range(5):
+        health.on_success()
+    assert health.interval == 0.5
+
+
+def test_host_health_retry_after_sets_not_before(clock):
+    health = HostHealth(min_interval=0.5, max_concurrency=2, max_interval=4.0)
+    health.on_overload(retry_after=2)
+    assert health.not_before == clock.now + 2
+    # Capped at max_interval
+    clock.now += 10
+    health.on_overload(retry_after=60)
+    assert health.not_before == clock.now + 4.0
+
+
+def test_breaker_release_allows_new_trial(clock):
+    breaker = CircuitBreaker(failures=1, cooldown=10)
+    breaker.record_failure('a')
+    clock.now += 10
+    assert breaker.allow('a')
+    breaker.release('a')
+    assert breaker.is_open('a') and breaker.allow('a')
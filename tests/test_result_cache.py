@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+from src.result_cache import FlightAbandoned, SearchCache
+
+
+def produce_slowly(calls, cacheable=True):
+    def produce():
+        calls.append(1)
+        for i in range(3):
+            time.sleep(0.05)
+            yield i
+        return 'result', cacheable
+    return produce
+
+
+def from_value(value):
+    yield f'cached:{value}'
+
+
+def test_stream_hit_after_cacheable_result():
+    cache = SearchCache()
+    calls = []
+    assert list(cache.stream_or_compute('k', produce_slowly(calls), from_value)) == [0, 1, 2]
+    assert list(cache.stream_or_compute('k', produce_slowly(calls), from_value)) == ['cached:result']
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_uncacheable_stream_result_is_not_stored():
+    cache = SearchCache()
+    calls = []
+    list(cache.stream_or_compute('k', produce_slowly(calls, cacheable=False), from_value))
+    list(cache.stream_or_compute('k', produce_slowly(calls, cacheable=False), from_value))
+    assert len(calls) == 2
+
+
+def test_concurrent_streams_and_plain_callers_share_one_flight():
+    cache = SearchCache()
+    calls = []
+    outputs = {}
+
+    def stream(name):
+        outputs[name] = list(cache.stream_or_compute('k', produce_slowly(calls), from_value))
+
+    def plain():
+        outputs['plain'] = cache.get_or_compute('k', lambda: calls.append(1) or 'other')
+
+    leader = threading.Thread(target=stream, args=('leader',))
+    leader.start()
+    time.sleep(0.02)
+    others = [threading.Thread(target=stream, args=('joiner',)), threading.Thread(target=plain)]
+    for thread in others:
+        thread.start()
+    for thread in [leader] + others:
+        thread.join()
+    assert len(calls) == 1
+    assert outputs == {'leader': [0, 1, 2], 'joiner': [0, 1, 2], 'plain': 'result'}
+    assert cache.stats()['coalesced'] == 2
+
+
+def test_stream_joins_plain_flight():
+    cache = SearchCache()
+    started = threading.Event()
+
+    def compute():
+        started.set()
+        time.sleep(0.05)
+        return 'value'
+
+    thread = threading.Thread(target=cache.get_or_compute, args=('k', compute))
+    thread.start()
+    started.wait()
+    assert list(cache.stream_or_compute('k', produce_slowly([]), from_value)) == ['cached:value']
+    thread.join()
+
+
+def test_abandoned_leader_fails_joiners():
+    cache = SearchCache()
+    leader = cache.stream_or_compute('k', produce_slowly([]), from_value)
+    assert next(leader) == 0
+    errors = []
+
+    def join():
+        try:
+            list(cache.stream_or_compute('k', produce_slowly([]), from_value))
+        except FlightAbandoned as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=join)
+    thread.start()
+    time.sleep(0.02)
+    leader.close()
+    thread.join()
+    assert len(errors) == 1
+    assert cache.stats()['in_flight'] == 0
+
+
+def test_leader_error_reaches_joiners():
+    cache = SearchCache()
+
+    def failing():
+        time.sleep(0.05)
+        raise ValueError('boom')
+        yield
+
+    results = []
+
+    def join():
+        with pytest.raises(ValueError):
+            list(cache.stream_or_compute('k', failing, from_value))
+        results.append('raised')
+
+    threads = [threading.Thread(target=join) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['raised', 'raised']
@@ -0,0 +1,101 @@
+import threading
+import time
+from datetime import timedelta
+
+from src.constants import HOST_ADAPTIVE_MAX_CONCURRENCY, HOST_MIN_INTERVAL
+from src.movie_scraper import TheaterScraper
+from src.resilience import CircuitBreaker, LastKnownResults
+from src.scrape_engine import AdaptiveHostPoliteness, AsyncScrapeEngine, host_health
+
+PAGE = '<div class="movie-title">Jawan</div><div class="showtime">Fr 14.03. 17:30</div>'
+PAGE_WITH_NEXT = PAGE + '<a class="next" href="?page=2">next</a>'
+
+
+class FakeResponse:
+    status_code = 200
+    from_cache = False
+    encoding = 'utf-8'
+    elapsed = timedelta(0)
+
+    def __init__(self, text):
+        self.text = text
+        self.content = text.encode('utf-8')
+
+
+class SlowHttp:
+    """Answers every URL with one listing page after `latency` seconds, tracking requests in flight."""
+
+    def __init__(self, latency, page=PAGE):
+        self.latency = latency
+        self.page = page
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.latency)
+        with self._lock:
+            self.active -= 1
+        return FakeResponse(self.page)
+
+
+def engine_for(host, listings, latency, page=PAGE, **kwargs):
+    urls = {f'listing{n}': f'https://{host}/listing{n}' for n in range(listings)}
+    scraper = TheaterScraper(urls=urls, page_params={key: '?page={}' for key in urls}, http=SlowHttp(latency, page))
+    kwargs.setdefault('politeness', AdaptiveHostPoliteness(0.0, HOST_ADAPTIVE_MAX_CONCURRENCY))
+    return AsyncScrapeEngine(scraper, breaker=CircuitBreaker(failures=1), last_known=LastKnownResults(), **kwargs)
+
+
+def test_engine_defaults_to_the_adaptive_budget():
+    engine = AsyncScrapeEngine(scraper=None)
+    assert engine.politeness.min_interval == HOST_MIN_INTERVAL
+    assert engine.politeness.max_concurrency == HOST_ADAPTIVE_MAX_CONCURRENCY > 1
+
+
+def test_prefetch_overlaps_the_pages_of_a_listing():
+    timings = {}
+    for prefetch in (False, True):
+        engine = engine_for(f'prefetch-{prefetch}.example', 1, latency=0.1, page=PAGE_WITH_NEXT, max_pages=5,
+                            prefetch=prefetch)
+        start = time.perf_counter()
+        assert len(engine.run(None)) == 5
+        timings[prefetch] = time.perf_counter() - start
+        assert engine.scraper.http.peak == (5 if prefetch else 1)
+    assert timings[True] < timings[False] / 2
+
+
+def test_prefetch_keeps_the_host_interval():
+    engine = engine_for('prefetch-interval.example', 1, latency=0.0, page=PAGE_WITH_NEXT, max_pages=3, prefetch=True,
+                        politeness=AdaptiveHostPoliteness(0.1, HOST_ADAPTIVE_MAX_CONCURRENCY))
+    start = time.perf_counter()
+    assert len(engine.run(None)) == 3
+    assert time.perf_counter() - start >= 0.2
+
+
+def test_healthy_host_ramps_up_to_concurrent_requests():
+    engine = engine_for('ramp.example', 4, latency=0.05, max_pages=1)
+    health = engine.politeness.health('ramp.example')
+    assert health.concurrency == 1
+    while health.concurrency < HOST_ADAPTIVE_MAX_CONCURRENCY:
+        health.on_success()
+    assert len(engine.run(None)) == 4
+    assert engine.scraper.http.peak == HOST_ADAPTIVE_MAX_CONCURRENCY
+
+
+def test_deadline_on_a_shared_host_is_not_a_host_failure():
+    engine = engine_for('shared-deadline.example', 2, latency=0.2, max_pages=1, deadline=0.05)
+    assert engine.run(None) == []
+    assert not engine.breaker.is_open('shared-deadline.example')
+    # Let the abandoned fetch threads finish before the next test
+    time.sleep(0.2)
+
+
+def test_backoff_is_shared_per_host():
+    health = host_health('shared.example', 1.0, 1)
+    health.on_overload()
+    assert host_health('shared.example', 1.0, 1).interval == health.interval == 2.0
+    # A looser budget cannot undo what was learned, a stricter one tightens it
+    assert host_health('shared.example', 0.1, 4).interval == 2.0
+    assert host_health('shared.example', 3.0, 1).interval == 3.0
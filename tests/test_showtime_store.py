@@ -0,0 +1,86 @@
+import threading
+from datetime import datetime, timedelta
+
+from src import showtime_store as store_module
+from src.showtime_store import SharedShowtimeStore, ShowtimeStore
+
+T0 = datetime(2025, 3, 14, 17, 0)
+THEATERS = {1: ('Cinemaxx Liederhalle', 'https://www.cinemaxx.de/stuttgart'),
+            2: ('Traumpalast Leonberg', 'https://leonberg.traumpalast.de')}
+MOVIES = {10: 'Leo', 20: 'Jawan'}
+ROWS = [
+    (1, 10, T0), (1, 20, T0), (2, 10, T0 + timedelta(hours=1)),
+    (1, 10, T0 + timedelta(hours=2)), (2, 20, T0 + timedelta(hours=2)), (2, 10, T0 + timedelta(hours=3))
+]
+
+
+def rows_of(results):
+    return sorted((result['theater_url'], result['title'], result['showtime']) for result in results)
+
+
+def brute_force(start=None, end=None, theater=None, movie_ids=None):
+    expected = []
+    for theater_id, movie_id, moment in ROWS:
+        name, url = THEATERS[theater_id]
+        if start is not None and moment < start or end is not None and moment >= end:
+            continue
+        if theater is not None and theater not in name.lower() and theater not in url:
+            continue
+        if movie_ids is None or movie_id in movie_ids:
+            expected.append((url, MOVIES[movie_id], moment))
+    return sorted(expected)
+
+
+def test_ranges_include_the_start_and_exclude_the_end():
+    store = ShowtimeStore(ROWS, THEATERS, MOVIES)
+    hour = timedelta(hours=1)
+    bounds = [None, T0 - hour, T0, T0 + hour, T0 + 2 * hour, T0 + 3 * hour, T0 + 4 * hour]
+    for start in bounds:
+        for end in bounds:
+            for theater in (None, 'leonberg', 'cinemaxx', 'nowhere'):
+                for movie_ids in (None, [10], [20], [10, 20], []):
+                    found = store.query(start, end, theater, movie_ids)
+                    expected = brute_force(start, end, theater, movie_ids)
+                    assert rows_of(found) == expected
+                    assert [row['showtime'] for row in found] == sorted(row['showtime'] for row in found)
+                    assert store.count(start, end, theater, movie_ids) == len(expected)
+
+
+def test_indexes_hold_each_theaters_and_movies_rows_in_time_order():
+    store = ShowtimeStore(ROWS, THEATERS, MOVIES)
+    for indexes, column in ((store.by_theater, store.theaters), (store.by_movie, store.movies)):
+        assert sorted(row for index in indexes for row in index.rows) == list(range(len(ROWS)))
+        for code, index in enumerate(indexes):
+            assert all(column[row] == code for row in index.rows)
+            assert list(index.starts) == sorted(index.starts) == [store.starts[row] for row in index.rows]
+
+
+def test_limit_and_empty_store():
+    store = ShowtimeStore(ROWS, THEATERS, MOVIES)
+    assert [row['showtime'] for row in store.query(limit=2)] == [T0, T0]
+    empty = ShowtimeStore()
+    assert empty.query(T0, T0 + timedelta(days=1)) == [] and empty.count() == 0
+
+
+def test_expired_store_is_served_while_one_caller_rebuilds(monkeypatch):
+    loads = []
+    rebuilding, release = threading.Event(), threading.Event()
+
+    def load(session, since=None):
+        loads.append(since)
+        if len(loads) == 2:
+            rebuilding.set()
+            release.wait(5)
+        return ShowtimeStore(ROWS, THEATERS, MOVIES)
+
+    monkeypatch.setattr(store_module.ShowtimeStore, 'load', staticmethod(load))
+    shared = SharedShowtimeStore(ttl=0)
+    first = shared.get(None)
+    rebuilder = threading.Thread(target=shared.get, args=(None,))
+    rebuilder.start()
+    assert rebuilding.wait(5)
+    # Does not wait for the rebuild in the other thread
+    assert shared.get(None) is first
+    release.set()
+    rebuilder.join(5)
+    assert len(loads) == 2 and shared._store is not first
@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+
+import pytest
+
+from src import streaming
+from src.resilience import CircuitBreaker
+
+PAGE = b'<div class="movie-title">Jawan</div><div class="showtime">Fr 14.03. 17:30</div><a class="next">next</a>'
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b''):
+        self.status_code = status_code
+        self.body = body
+        self.encoding = 'utf-8'
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+class FakeHttp:
+    def __init__(self, responses):
+        self.responses = responses
+
+    @contextmanager
+    def stream(self, url):
+        yield self.responses[url]
+
+
+class FakeScraper:
+    def __init__(self, responses):
+        self.http = FakeHttp(responses)
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failures=1, cooldown=0)
+    monkeypatch.setattr(streaming, 'circuit_breaker', breaker)
+    return breaker
+
+
+def open_trial(breaker, host):
+    breaker.record_failure(host)
+    assert breaker.allow(host)
+
+
+def test_streams_pages_until_last(breaker):
+    scraper = FakeScraper({'http://t/?page=1': FakeResponse(200, PAGE), 'http://t/?page=2': FakeResponse(404)})
+    results = list(streaming.iter_listing(scraper, 'http://t/', '?page={}', None, interval=0))
+    assert [(r['title'], r['times'], r['link']) for r in results] == [('Jawan', 'Fr 14.03. 17:30', 'http://t/?page=1')]
+
+
+@pytest.mark.parametrize('status', [404, 403])
+def test_non_retryable_trial_closes_breaker(breaker, status):
+    scraper = FakeScraper({'http://t/?page=1': FakeResponse(status)})
+    open_trial(breaker, 't')
+    assert list(streaming.iter_listing(scraper, 'http://t/', '?page={}', None, interval=0)) == []
+    assert not breaker.is_open('t')
+
+
+def test_retryable_trial_reopens_breaker(breaker):
+    scraper = FakeScraper({'http://t/?page=1': FakeResponse(503)})
+    open_trial(breaker, 't')
+    list(streaming.iter_listing(scraper, 'http://t/', '?page={}', None, interval=0))
+    assert breaker.is_open('t')
+
+
+def test_closing_mid_listing_leaves_host_allowed(breaker):
+    scraper = FakeScraper({'http://t/?page=1': FakeResponse(200, PAGE * 3)})
+    open_trial(breaker, 't')
+    listing = streaming.iter_listing(scraper, 'http://t/', '?page={}', None, interval=0)
+    next(listing)
+    listing.close()
+    assert not breaker.is_open('t') and breaker.allow('t')
+
+
+def test_stream_results_closes_listings_early(breaker):
+    pages = {f'http://t{n}/?page=1': FakeResponse(200, PAGE * 50) for n in range(3)}
+    scraper = FakeScraper(pages)
+    targets = [(f't{n}', f'http://t{n}/', '?page={}') for n in range(3)]
+    stream = streaming.stream_results(scraper, None, max_pages=1, targets=targets, queue_size=1)
+    next(stream)
+    stream.close()
+    assert breaker.open_hosts() == []
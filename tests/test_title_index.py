@@ -0,0 +1,38 @@
+import pytest
+
+from src.title_index import TitleIndex, normalize, title_matches
+
+
+def test_transliteration_variants_fold_together():
+    assert normalize('Jawaan') == normalize('Jawan')
+    assert normalize('Bhool Bhulaiyaa 3') == normalize('Bhul Bhulaiya III')
+    assert normalize('Pushpa') == normalize('Pushpaa')
+    assert title_matches('Kantara', 'Kaantaara')
+
+
+def test_stopwords_and_screening_tags_are_ignored():
+    assert normalize('Leo (Tamil) OmU') == normalize('Leo')
+    assert normalize('The Greatest of All Time - IMAX 3D') == normalize('Greatest of All Time')
+    assert title_matches('Stree 2', 'Stree 2 (Hindi)')
+
+
+def test_whole_phrase_in_title_is_boosted():
+    index = TitleIndex(['Pushpa 2: The Rule', 'Pushpa: The Rise', 'Rule Breakers'])
+    results = index.search('Pushpa 2', min_score=0.0)
+    assert results[0][:2] == ('Pushpa 2: The Rule', None)
+    assert results[0][2] >= 0.9
+
+
+@pytest.mark.parametrize('query', ['Push', 'pushp', 'Pushpa 2: The R'])
+def test_short_prefix_queries_find_the_title(query):
+    assert title_matches(query, 'Pushpa 2: The Rule (Telugu)')
+
+
+@pytest.mark.parametrize('query', ['Pu', 'ushpa', 'shpa'])
+def test_prefixes_need_three_letters_at_a_word_start(query):
+    assert not title_matches(query, 'Pushpa 2: The Rule')
+
+
+def test_prefix_matches_rank_below_whole_words():
+    index = TitleIndex(['Pushpa 2', 'Push'])
+    assert [title for title, _, _ in index.search('Push')] == ['Push', 'Pushpa 2']
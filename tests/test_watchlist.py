@@ -0,0 +1,35 @@
+import pytest
+
+from src.title_index import title_matches
+from src.watchlist import AhoCorasick, WatchlistMatcher, match_watchlist
+
+WATCHLIST = [
+    'Pushpa', 'Pushpa 2', 'Push', 'Pu', 'Leo', 'Leon', 'Kalki 2898 AD', 'Kal', 'Stree', 'Stree 2',
+    'Bhool Bhulaiyaa 3', 'The Rule', 'Devara Part 1', 'Jawan', 'Jawani', 'The', 'Rise'
+]
+CORPUS = [
+    'Pushpa 2: The Rule (Telugu)', 'Pushpa: The Rise', 'Pushpa 2 - The Rule OmU', 'Leo (Tamil) OmU',
+    'Leon - Der Profi', 'Leonie', 'Kalki 2898 AD', 'Kalkutta Express', 'Stree 2 (Hindi)', 'Stree',
+    'Bhul Bhulaiya III', 'Rule Breakers', 'Devara: Part 1', 'Jawaan', 'Jawani Jaaneman', 'Push', 'Pu', 'The',
+    'Sunrise', 'Rising Sun', 'Der Teufel trägt Prada 2', ''
+]
+
+
+@pytest.mark.parametrize('min_score', [0.5, 0.7, 0.85, 0.95])
+def test_matcher_agrees_with_brute_force(min_score):
+    matcher = WatchlistMatcher(WATCHLIST, min_score)
+    for title in CORPUS:
+        expected = {watch_id for watch_id, watched in enumerate(WATCHLIST) if title_matches(watched, title, min_score)}
+        assert matcher.match(title) == expected, title
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+    assert automaton.find('ushers') == {0, 1, 3}
+    assert automaton.find('ahishe') == {0, 1, 2}
+
+
+def test_records_are_grouped_under_every_matching_title():
+    records = [{'title': 'Pushpa 2: The Rule (Telugu)'}, {'title': 'Leo (Tamil)'}]
+    matches = match_watchlist(['Push', 'Pushpa 2', 'Leo', 'Devara'], records)
+    assert matches == {'Push': [records[0]], 'Pushpa 2': [records[0]], 'Leo': [records[1]], 'Devara': []}
@@ -0,0 +1,149 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from src import work_queue
+from src.models import Base, Showtime
+from src.movie_scraper import TheaterScraper
+from src.work_queue import PageWorker, WorkQueue, page_task
+
+URL = 'https://cinema.example/programm'
+PAGE_PARAM = '?page={}'
+LISTING = '<div class="movie-title">Leo</div><div class="showtime">17:30 20:00</div>'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(work_queue, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = WorkQueue(str(tmp_path / 'queue.db'), lease_seconds=60, max_attempts=2, host_interval=5)
+    yield queue
+    queue.close()
+
+
+def test_expired_lease_is_handed_out_again(queue, clock):
+    queue.enqueue('a', {}, 'one.example')
+    first = queue.lease('worker-1')
+    clock.now += 30
+    assert queue.lease('worker-2') is None
+    clock.now += 31
+    second = queue.lease('worker-2')
+    assert (second.id, second.attempts) == (first.id, 2)
+    # The first worker lost its lease and can no longer settle the task
+    assert not queue.complete(first)
+    assert queue.complete(second)
+    assert queue.stats()['done'] == 1
+
+
+def test_duplicate_enqueue_collapses_to_one_task(queue):
+    assert queue.enqueue('a', {}, 'one.example')
+    assert not queue.enqueue('a', {'other': 'payload'}, 'one.example')
+    assert queue.stats() == {'pending': 1, 'leased': 0, 'done': 0, 'failed': 0}
+    task = queue.lease('worker')
+    assert not queue.enqueue('a', {}, 'one.example')
+    queue.complete(task)
+    # Finished tasks do not block the next crawl of the same page
+    assert queue.enqueue('a', {}, 'one.example')
+
+
+def test_task_is_parked_as_failed_after_max_attempts(queue, clock):
+    queue.enqueue('a', {}, 'one.example')
+    assert queue.fail(queue.lease('worker'), 'HTTP 503')
+    assert queue.stats()['pending'] == 1
+    clock.now += 120
+    assert queue.fail(queue.lease('worker'), 'HTTP 503')
+    assert queue.stats() == {'pending': 0, 'leased': 0, 'done': 0, 'failed': 1}
+    clock.now += 120
+    assert queue.lease('worker') is None
+
+
+def test_requests_to_one_host_are_spaced_out(queue, clock):
+    queue.enqueue('a1', {}, 'a.example')
+    queue.enqueue('a2', {}, 'a.example')
+    queue.enqueue('b1', {}, 'b.example')
+    assert [queue.lease('worker').key for _ in range(2)] == ['a1', 'b1']
+    assert queue.lease('worker') is None
+    clock.now += 5
+    assert queue.lease('worker').key == 'a2'
+
+
+class FakeResponse:
+    def __init__(self, status_code, text=''):
+        self.status_code = status_code
+        self.text = text
+
+
+class FakeHttp:
+    def __init__(self):
+        self.pages = {}
+
+    def get(self, url):
+        return self.pages[url]
+
+
+@pytest.fixture
+def worker(tmp_path, queue):
+    engine = create_engine(f"sqlite:///{tmp_path / 'showtimes.db'}")
+    Base.metadata.create_all(engine)
+    scraper = TheaterScraper(urls={'cinema': URL}, page_params={'cinema': PAGE_PARAM}, http=FakeHttp())
+    return PageWorker(queue, scraper, sessionmaker(bind=engine))
+
+
+def crawl_page(worker, page, clock):
+    clock.now += 5
+    worker.queue.enqueue(*page_task('cinema', URL, PAGE_PARAM, page, 3), 'cinema.example')
+    task = worker.queue.lease('worker')
+    try:
+        return worker.process(task)
+    finally:
+        worker.queue.complete(task)
+
+
+def stored_pages(worker):
+    with worker.session_factory() as session:
+        return sorted(session.execute(select(Showtime.page_url)).scalars())
+
+
+def test_page_with_next_link_enqueues_the_next_page(worker, queue, clock):
+    worker.scraper.http.pages[f'{URL}?page=1'] = FakeResponse(200, LISTING + '<a class="next">next</a>')
+    assert crawl_page(worker, 1, clock)
+    assert stored_pages(worker) == [f'{URL}?page=1'] * 2
+    clock.now += 5
+    assert queue.lease('worker').key == f'{URL}?page=2'
+
+
+def test_404_ends_the_listing_and_drops_later_pages(worker, queue, clock):
+    worker.scraper.http.pages[f'{URL}?page=2'] = FakeResponse(200, LISTING)
+    assert not crawl_page(worker, 2, clock)
+    assert stored_pages(worker) == [f'{URL}?page=2'] * 2
+
+    worker.scraper.http.pages[f'{URL}?page=2'] = FakeResponse(404)
+    assert not crawl_page(worker, 2, clock)
+    assert stored_pages(worker) == []
+    clock.now += 5
+    assert queue.lease('worker') is None
+
+
+def test_refused_page_leaves_the_listing_alone(worker, clock):
+    worker.scraper.http.pages[f'{URL}?page=1'] = FakeResponse(200, LISTING)
+    crawl_page(worker, 1, clock)
+    worker.scraper.http.pages[f'{URL}?page=1'] = FakeResponse(403)
+    assert not crawl_page(worker, 1, clock)
+    assert stored_pages(worker) == [f'{URL}?page=1'] * 2
+
+    worker.scraper.http.pages[f'{URL}?page=1'] = FakeResponse(503)
+    with pytest.raises(RuntimeError):
+        crawl_page(worker, 1, clock)
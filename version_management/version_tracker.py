@@ -1,17 +1,22 @@
 import subprocess
 import re
 import os
+import json
+import hashlib
 import logging
 import argparse
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
-import torch
-from transformers import pipeline, AutoModelForCausalLM, AutoTokenizer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = 'EleutherAI/gpt-neo-1.3B'
+# Fits small CPU-only runners; ~10x fewer parameters than the default
+SMALL_MODEL = 'EleutherAI/gpt-neo-125M'
+NOTES_CACHE_FILE = '.release_notes_cache.json'
+
 class VersionManager:
     """Manages reading and updating version information in a file using an absolute path."""
     def __init__(self, version_file: str = None):
@@ -46,7 +51,7 @@ class VersionManager:
         version_pattern = re.compile(r"^(__version__\s*=\s*['\"]).*?(['\"])", re.M)
         with open(self.version_file, 'r+') as f:
             content = f.read()
-            new_content = version_pattern.sub(rf"\1{new_version}\2", content)
+            new_content = version_pattern.sub(rf"\g<1>{new_version}\g<2>", content)
             f.seek(0)
             f.write(new_content)
             f.truncate()
@@ -67,6 +72,21 @@ class GitManager:
             logger.error(f"Error getting changed files: {e.stderr.decode()}")
             raise
 
+    @staticmethod
+    def get_commits(limit: int = 5) -> List[Tuple[str, str]]:
+        """Returns (hash, subject) pairs for the last `limit` commits."""
+        try:
+            result = subprocess.run(
+                ['git', 'log', f'-{limit}', '--pretty=format:%H%x09%s'],
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+            return [tuple(line.split('\t', 1)) for line in result.stdout.decode().splitlines() if '\t' in line]
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error getting commit history: {e.stderr.decode()}")
+            raise
+
     @staticmethod
     def get_commit_history(limit: int = 5) -> List[str]:
         try:
@@ -119,14 +139,100 @@ class VersionIncrementor:
             return 'minor'
         return 'patch'
 
+class ConventionalNotesGenerator:
+    """Builds release notes from conventional commit subjects, without a language model."""
+    COMMIT_PATTERN = re.compile(r'^(?P<type>\w+)(?:\((?P<scope>[^)]*)\))?(?P<breaking>!)?:\s*(?P<subject>.+)$')
+    SECTIONS = [
+        ('breaking', 'Breaking changes'),
+        ('feat', 'Features'),
+        ('fix', 'Bug fixes'),
+        ('perf', 'Performance'),
+        ('other', 'Other changes'),
+    ]
+
+    @classmethod
+    def parse(cls, message: str) -> Tuple[str, str]:
+        """Returns (section, text) for one commit subject."""
+        match = cls.COMMIT_PATTERN.match(message.strip())
+        if not match:
+            return 'other', message.strip()
+        text = match.group('subject').strip()
+        if match.group('scope'):
+            text = f"{match.group('scope')}: {text}"
+        if match.group('breaking') or message.startswith('BREAKING CHANGE'):
+            return 'breaking', text
+        kind = match.group('type').lower()
+        return (kind if kind in ('feat', 'fix', 'perf') else 'other'), text
+
+    def generate_summary(self, commit_messages: List[str]) -> Tuple[str, str]:
+        grouped: Dict[str, List[str]] = {}
+        for message in commit_messages:
+            section, text = self.parse(message)
+            grouped.setdefault(section, []).append(text)
+        counts = [f"{len(grouped[key])} {label.lower()}" for key, label in self.SECTIONS if key in grouped]
+        title = f"Release with {', '.join(counts)}" if counts else "New Release"
+        blocks = []
+        for key, label in self.SECTIONS:
+            if key in grouped:
+                blocks.append(f"### {label}\n" + "\n".join(f"- {text}" for text in grouped[key]))
+        description = "\n\n".join(blocks) or "Various improvements and bug fixes"
+        return title, description
+
+
+class NotesCache:
+    """Generated notes on disk, keyed by the commit hashes (and model) they summarize."""
+    def __init__(self, cache_file: str = None):
+        # Defaults to the project root, like the version file
+        self.cache_file = Path(cache_file) if cache_file else Path(__file__).resolve().parent.parent / NOTES_CACHE_FILE
+        self._entries: Optional[Dict[str, Dict[str, str]]] = None
+
+    @staticmethod
+    def key(commit_hashes: List[str], model_name: str) -> str:
+        return hashlib.sha256('\n'.join([model_name, *commit_hashes]).encode()).hexdigest()
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.cache_file.read_text())
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        entry = self._load().get(key)
+        return (entry['title'], entry['description']) if entry else None
+
+    def set(self, key: str, title: str, description: str) -> None:
+        entries = self._load()
+        entries[key] = {'title': title, 'description': description}
+        try:
+            self.cache_file.write_text(json.dumps(entries, indent=2))
+        except OSError as e:
+            logger.warning(f"Could not write release notes cache: {e}")
+
+
 class ReleaseNotesGenerator:
-    """Generates release notes using a language model."""
-    def __init__(self, model_name: str = 'EleutherAI/gpt-neo-1.3B'):
+    """Generates release notes using a language model.
+
+    torch/transformers are imported and the model is loaded on the first
+    generate_summary call, so git analysis and cached runs never pay for them.
+    """
+    def __init__(self, model_name: str = DEFAULT_MODEL, quantize: bool = False):
         self.model_name = model_name
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForCausalLM.from_pretrained(model_name)
+        self.quantize = quantize
+        self.generator = None
+
+    def _load(self) -> None:
+        import torch
+        from transformers import pipeline, AutoModelForCausalLM, AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self.model = AutoModelForCausalLM.from_pretrained(self.model_name)
         # Set device: use CUDA if available; otherwise CPU.
         self.device = 0 if torch.cuda.is_available() else -1
+        if self.quantize and self.device == -1:
+            # int8 dynamic quantization of the linear layers: smaller and faster on CPU
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
         logger.info(f"Device set to use {'cuda:0' if self.device == 0 else 'cpu'}")
         self.generator = pipeline(
             'text-generation',
@@ -136,6 +242,8 @@ class ReleaseNotesGenerator:
         )
 
     def generate_summary(self, commit_messages: List[str]) -> Tuple[str, str]:
+        if self.generator is None:
+            self._load()
         commit_str = "\n".join(commit_messages)
         prompt = (
             "Generate release notes with a title and description based on these commits:\n"
@@ -156,6 +264,8 @@ class ReleaseNotesGenerator:
             # Check if it's a CUDA OOM error
             if "CUDA out of memory" in str(e):
                 logger.warning("CUDA out of memory encountered. Switching to CPU for generation.")
+                import torch
+                from transformers import pipeline
                 torch.cuda.empty_cache()
                 # Reinitialize the generator to use CPU
                 self.generator = pipeline(
@@ -224,7 +334,14 @@ def main():
     parser.add_argument('--version_file', type=str, default=None,
                         help='Absolute or relative path to the version file. If relative, it is assumed relative to the project root.')
     parser.add_argument('--commit_limit', type=int, default=5, help='Number of commit messages to include')
-    parser.add_argument('--model_name', type=str, default='EleutherAI/gpt-neo-1.3B', help='Model name for release notes generation')
+    parser.add_argument('--model_name', type=str, default=None,
+                        help=f'Model name for release notes generation (default: {DEFAULT_MODEL})')
+    parser.add_argument('--small_model', action='store_true', help=f'Use {SMALL_MODEL}, suited to CPU-only runners')
+    parser.add_argument('--quantize', action='store_true', help='int8-quantize the model when running on CPU')
+    parser.add_argument('--no_llm', '--no-llm', action='store_true',
+                        help='Build notes from conventional commit messages without loading a model')
+    parser.add_argument('--no_cache', action='store_true', help='Regenerate notes even if these commits were summarized before')
+    parser.add_argument('--dry_run', action='store_true', help='Print the next version and notes without writing anything')
     parser.add_argument('--update_changelog', action='store_true', help='Append release notes to CHANGELOG.md')
     args = parser.parse_args()
 
@@ -233,23 +350,44 @@ def main():
         version_manager = VersionManager(args.version_file)
         git_manager = GitManager()
         incrementor = VersionIncrementor()
-        notes_generator = ReleaseNotesGenerator(args.model_name)
+        model_name = args.model_name or (SMALL_MODEL if args.small_model else DEFAULT_MODEL)
+        if args.no_llm:
+            notes_generator = ConventionalNotesGenerator()
+            cache_model = 'conventional-commits'
+        else:
+            # Nothing is loaded until notes actually have to be generated
+            notes_generator = ReleaseNotesGenerator(model_name, quantize=args.quantize)
+            cache_model = f"{model_name}{'+int8' if args.quantize else ''}"
+        notes_cache = NotesCache()
 
         # Gather information from Git and version file
         current_version = version_manager.get_current_version()
         changed_files = git_manager.get_changed_files()
-        commit_messages = git_manager.get_commit_history(args.commit_limit)
+        commits = git_manager.get_commits(args.commit_limit)
+        commit_messages = [message for _, message in commits]
         change_level = incrementor.determine_change_level(changed_files, commit_messages)
         new_version = incrementor.increment_version(current_version, change_level)
-        title, description = notes_generator.generate_summary(commit_messages)
 
-        # Update the version file
-        version_manager.update_version(new_version)
+        cache_key = notes_cache.key([commit_hash for commit_hash, _ in commits], cache_model)
+        cached = None if args.no_cache else notes_cache.get(cache_key)
+        if cached:
+            logger.info("Using cached release notes for these commits")
+            title, description = cached
+        else:
+            title, description = notes_generator.generate_summary(commit_messages)
+            if not args.dry_run:
+                notes_cache.set(cache_key, title, description)
 
-        logger.info(f"Updated version: {current_version} → {new_version}")
+        logger.info(f"{'Next' if args.dry_run else 'Updated'} version: {current_version} → {new_version}")
         logger.info(f"Change level: {change_level}")
         logger.info(f"Release Title: {title}")
         logger.info(f"Release Description:\n{description}")
+        if args.dry_run:
+            # Exit here so nothing below (or the tagging script after main) runs
+            raise SystemExit(0)
+
+        # Update the version file
+        version_manager.update_version(new_version)
 
         # Optionally update the changelog
         if args.update_changelog: